@@ -0,0 +1,38 @@
+import tempfile
+import time
+
+from pipeline import Pipeline
+
+import qsurvey
+
+NUM_REPEATS = 5
+
+
+def startup(cache):
+    """Load everything the scripts need before students are constructed"""
+    pipeline = Pipeline(cache=cache)
+
+    return pipeline.course_map, pipeline.features, pipeline.schedule
+
+
+with tempfile.TemporaryDirectory() as cache_dir:
+    cache = qsurvey.Cache(cache_dir)
+
+    uncached, cold, warm = [], [], []
+    for _ in range(NUM_REPEATS):
+        start = time.perf_counter()
+        startup(None)
+        uncached.append(time.perf_counter() - start)
+
+        cache.clear()
+        start = time.perf_counter()
+        startup(cache)
+        cold.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        startup(cache)
+        warm.append(time.perf_counter() - start)
+
+print(f"no cache: {min(uncached):.3f}s")
+print(f"cold cache: {min(cold):.3f}s")
+print(f"warm cache: {min(warm):.3f}s, speedup {min(uncached) / min(warm):.1f}x")
@@ -0,0 +1,46 @@
+import os
+import tempfile
+import time
+
+import pandas as pd
+from pipeline import MAPPING_FILE, SCHEDULE_FILE, SURVEY_FILE
+
+import qsurvey
+
+NUM_TERMS = [1, 10, 100]
+NUM_REPEATS = 3
+
+cache = qsurvey.Cache()
+mp = qsurvey.QMapper(MAPPING_FILE, cache)
+crs_sec_cap_map = qsurvey.QSchedule(SCHEDULE_FILE, cache).capacities()
+df = pd.read_csv(SURVEY_FILE)
+
+
+def load_time(in_file):
+    """Best time to load in_file into a QSurvey"""
+    times = []
+    for _ in range(NUM_REPEATS):
+        start = time.perf_counter()
+        qsurvey.QSurvey(in_file, mp, list(crs_sec_cap_map.keys()))
+        times.append(time.perf_counter() - start)
+
+    return min(times)
+
+
+with tempfile.TemporaryDirectory() as tmp_dir:
+    for num_terms in NUM_TERMS:
+        # an archive of num_terms copies of the survey
+        csv_file = os.path.join(tmp_dir, f"survey_{num_terms}.csv")
+        npz_file = os.path.join(tmp_dir, f"survey_{num_terms}.npz")
+        pd.concat([df] * num_terms, ignore_index=True).to_csv(csv_file, index=False)
+        start = time.perf_counter()
+        qsurvey.convert_survey(csv_file, npz_file)
+        convert = time.perf_counter() - start
+
+        csv_time, npz_time = load_time(csv_file), load_time(npz_file)
+        print(
+            f"{num_terms * len(df)} rows: csv {csv_time * 1000:.1f}ms "
+            f"({os.path.getsize(csv_file) / 2**20:.1f}MB), "
+            f"columnar {npz_time * 1000:.1f}ms ({os.path.getsize(npz_file) / 2**20:.1f}MB), "
+            f"speedup {csv_time / npz_time:.1f}x, conversion {convert:.2f}s"
+        )
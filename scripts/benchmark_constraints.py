@@ -0,0 +1,83 @@
+import time
+
+import numpy as np
+from pipeline import Pipeline
+
+import qsurvey
+
+NUM_STUDENTS = [1_000, 10_000]
+SPARSE = None  # None chooses dense or sparse storage per constraint
+seed = 0
+RNG = np.random.default_rng(seed)
+pref_thresh = 5
+
+pipeline = Pipeline()
+qs, course_map = pipeline.qs, pipeline.course_map
+features, schedule = pipeline.features, pipeline.schedule
+course, slot, weekday, section = features
+
+
+def build_per_student(responses, total_courses):
+    """Baseline: every student constructs its own copy of the global constraints"""
+    students = []
+    for response, total in zip(responses, total_courses):
+        preferred = qsurvey.top_preferred(
+            course_map, schedule, course, response, pref_thresh
+        )
+        students.append(
+            qsurvey.SurveyStudent(
+                preferred,
+                total,
+                course,
+                section,
+                [
+                    qs.course_time_constr(features, schedule, SPARSE),
+                    qs.course_sect_constr(features, schedule, SPARSE),
+                ],
+                schedule,
+                SPARSE,
+            )
+        )
+
+    return students
+
+
+def build_shared(responses, total_courses):
+    """Global constraints are built once by the registry and shared by every student"""
+    qs.registry.clear()
+    students = []
+    for response, total in zip(responses, total_courses):
+        preferred = qsurvey.top_preferred(
+            course_map, schedule, course, response, pref_thresh
+        )
+        students.append(
+            qsurvey.SurveyStudent(
+                preferred,
+                total,
+                course,
+                section,
+                qs.global_constraints(features, schedule, SPARSE),
+                schedule,
+                SPARSE,
+            )
+        )
+
+    return students
+
+
+for num_students in NUM_STUDENTS:
+    responses = RNG.integers(1, 9, size=(num_students, len(schedule)))
+    total_courses = RNG.integers(1, 5, size=num_students)
+
+    start = time.perf_counter()
+    build_per_student(responses, total_courses)
+    per_student = time.perf_counter() - start
+
+    start = time.perf_counter()
+    build_shared(responses, total_courses)
+    shared = time.perf_counter() - start
+
+    print(
+        f"{num_students} students: per-student {per_student:.2f}s, "
+        f"shared {shared:.2f}s, speedup {per_student / shared:.1f}x"
+    )
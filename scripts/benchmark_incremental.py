@@ -0,0 +1,59 @@
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+from pipeline import STATUS_MAX_COURSE_MAP, SURVEY_FILE, Pipeline
+
+import qsurvey
+
+CHANGED_FRACTION = 0.01
+seed = 0
+pref_thresh = 5
+
+pipeline = Pipeline(cache=qsurvey.Cache())
+qs, course_map, all_courses = pipeline.qs, pipeline.course_map, pipeline.all_courses
+features, schedule = pipeline.features, pipeline.schedule
+crs_sec_cap_map = pipeline.crs_sec_cap_map
+
+population = qsurvey.IncrementalPopulation(
+    course_map, features, schedule, STATUS_MAX_COURSE_MAP, pref_thresh
+)
+population.update(qs, crs_sec_cap_map)
+
+# edit the ratings of a fraction of the respondents and the capacity of one section
+rng = np.random.default_rng(seed)
+df = pd.read_csv(SURVEY_FILE)
+rows = rng.choice(len(df), int(CHANGED_FRACTION * len(df)), replace=False)
+df.loc[rows, all_courses] = rng.integers(1, 9, size=(len(rows), len(all_courses)))
+catalog = next(iter(crs_sec_cap_map))
+new_crs_sec_cap_map = {crs: dict(secs) for crs, secs in crs_sec_cap_map.items()}
+for sec in new_crs_sec_cap_map[catalog]:
+    new_crs_sec_cap_map[catalog][sec] += 5
+
+with tempfile.TemporaryDirectory() as tmp_dir:
+    new_survey_file = os.path.join(tmp_dir, "survey_data.csv")
+    df.to_csv(new_survey_file, index=False)
+    new_qs = qsurvey.QSurvey(new_survey_file, pipeline.mp, list(crs_sec_cap_map.keys()))
+
+    start = time.perf_counter()
+    new_qs.students(
+        course_map,
+        all_courses,
+        features,
+        schedule,
+        STATUS_MAX_COURSE_MAP,
+        pref_thresh,
+    )
+    full = time.perf_counter() - start
+
+    start = time.perf_counter()
+    changes = population.update(new_qs, new_crs_sec_cap_map)
+    incremental = time.perf_counter() - start
+
+print(changes)
+print(
+    f"full rebuild {full:.3f}s, incremental update {incremental:.3f}s, "
+    f"speedup {full / incremental:.1f}x"
+)
@@ -0,0 +1,45 @@
+import time
+
+import numpy as np
+from pipeline import Pipeline
+
+import qsurvey
+
+NUM_STUDENTS = 10_000
+STORAGE = {"dense": False, "sparse": True, "auto": None}
+seed = 0
+pref_thresh = 5
+max_total_courses = 4
+
+pipeline = Pipeline(cache=qsurvey.Cache())
+qs, course_map = pipeline.qs, pipeline.course_map
+features, schedule = pipeline.features, pipeline.schedule
+course, slot, weekday, section = features
+total_course_list = qs.df["3"].dropna().astype(int).tolist()
+responses = np.random.default_rng(seed).integers(
+    1, 9, size=(NUM_STUDENTS, len(schedule))
+)
+
+for label, sparse in STORAGE.items():
+    start = time.perf_counter()
+    students = qsurvey.SurveyStudent.from_responses(
+        responses,
+        total_course_list,
+        course,
+        section,
+        course_map,
+        qs.global_constraints(features, schedule, sparse),
+        schedule,
+        rng=np.random.default_rng(seed),
+        pref_thresh=pref_thresh,
+        max_total_courses=max_total_courses,
+        sparse=sparse,
+    )
+    elapsed = time.perf_counter() - start
+    report = qsurvey.constraint_memory(students)
+
+    print(
+        f"{label}: {elapsed:.2f}s, constraints {report['total'] / 2**20:.1f} MiB "
+        f"(global {report['global'] / 2**10:.1f} KiB, "
+        f"{report['dense']} dense, {report['sparse']} sparse)"
+    )
@@ -0,0 +1,82 @@
+import time
+
+import numpy as np
+from pipeline import Pipeline
+from scipy.stats import multinomial
+
+import qsurvey
+
+NUM_STUDENTS = [10_000, 100_000]
+SPARSE = None  # None chooses dense or sparse storage per constraint
+seed = 0
+pref_thresh = 5
+max_total_courses = 4
+
+pipeline = Pipeline(cache=qsurvey.Cache())
+qs, course_map = pipeline.qs, pipeline.course_map
+features, schedule = pipeline.features, pipeline.schedule
+course, slot, weekday, section = features
+global_constraints = qs.global_constraints(features, schedule, SPARSE)
+total_course_list = qs.df["3"].dropna().astype(int).tolist()
+
+
+def build_per_student_draws(responses, rng):
+    """Baseline: a multinomial draw per student interleaved with construction"""
+    totals = [max(1, min(max_total_courses, tot)) for tot in total_course_list]
+    classes, counts = np.unique(totals, return_counts=True)
+    dist = multinomial(1, counts / len(totals))
+    preferred_idxs = qsurvey.batch_top_preferred(course_map, responses, pref_thresh)
+    values = qsurvey.course_section_values(schedule, course, section)
+
+    students = []
+    for idxs in preferred_idxs:
+        total_courses = classes[np.argmax(dist.rvs(random_state=rng)[0])]
+        students.append(
+            qsurvey.SurveyStudent(
+                idxs,
+                total_courses,
+                course,
+                section,
+                global_constraints,
+                schedule,
+                SPARSE,
+                schedule_values=values,
+            )
+        )
+
+    return students
+
+
+def build_single_draw(responses, rng):
+    return qsurvey.SurveyStudent.from_responses(
+        responses,
+        total_course_list,
+        course,
+        section,
+        course_map,
+        global_constraints,
+        schedule,
+        rng=rng,
+        pref_thresh=pref_thresh,
+        max_total_courses=max_total_courses,
+        sparse=SPARSE,
+    )
+
+
+for num_students in NUM_STUDENTS:
+    responses = np.random.default_rng(seed).integers(
+        1, 9, size=(num_students, len(schedule))
+    )
+
+    start = time.perf_counter()
+    build_per_student_draws(responses, np.random.default_rng(seed))
+    before = time.perf_counter() - start
+
+    start = time.perf_counter()
+    build_single_draw(responses, np.random.default_rng(seed))
+    after = time.perf_counter() - start
+
+    print(
+        f"{num_students} students: per-student draws {before:.2f}s, "
+        f"single draw {after:.2f}s, speedup {before / after:.1f}x"
+    )
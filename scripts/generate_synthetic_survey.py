@@ -0,0 +1,68 @@
+import os
+
+import qsurvey
+
+SCALE = 10  # rows generated per actual respondent
+NUM_SUB_KERNELS = 3
+SAMPLE_PER_STUDENT = 10
+CHUNKSIZE = 100_000
+WORKERS = 6
+SEED = None
+
+status_max_course_map = {
+    1: 6,
+    2: 6,
+    3: 6,
+    4: 6,
+    5: 4,
+    6: 4,
+}
+status_crs_prefix_map = {
+    1: ["1", "2", "3"],
+    2: ["1", "2", "3", "4"],
+    3: ["1", "2", "3", "4", "5"],
+    4: ["2", "3", "4", "5", "6"],
+    5: ["5", "6"],
+    6: ["5", "6"],
+}
+
+survey_file = "resources/survey_data.csv"
+schedule_file = "resources/anonymized_courses.xlsx"
+mapping_file = "resources/survey_column_mapping.csv"
+# a .npz path writes the columnar format instead
+out_file = os.path.join("resources", f"synthetic_survey_{SCALE}x.csv")
+
+
+def main():
+    cache = qsurvey.Cache()
+    mp = qsurvey.QMapper(mapping_file, cache)
+    qd = qsurvey.QSchedule(schedule_file, cache)
+    crs_sec_cap_map = qd.capacities()
+    qs = qsurvey.QSurvey(survey_file, mp, list(crs_sec_cap_map.keys()))
+    course_map = mp.mapping(qs.all_courses)
+    all_courses = [crs for crs in course_map.keys()]
+    features, schedule = mp.features_and_schedule(course_map, crs_sec_cap_map)
+    relevance = qsurvey.StatusRelevance(all_courses, course_map, status_crs_prefix_map)
+
+    model = qsurvey.SurveyModel.from_survey(
+        qs,
+        course_map,
+        schedule,
+        relevance,
+        status_max_course_map,
+        SAMPLE_PER_STUDENT,
+        NUM_SUB_KERNELS,
+        seed=SEED,
+        cache=cache,
+        workers=WORKERS,
+    )
+    num_rows = SCALE * len(qs.df)
+    chunks = qsurvey.generate_realistic_survey(
+        model, num_rows, SEED, CHUNKSIZE, workers=WORKERS
+    )
+    qsurvey.write_survey(chunks, out_file)
+    print(f"wrote {num_rows} rows to {out_file}")
+
+
+if __name__ == "__main__":
+    main()
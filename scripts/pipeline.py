@@ -0,0 +1,56 @@
+from pathlib import Path
+
+import qsurvey
+
+RESOURCES = Path(__file__).resolve().parent.parent / "resources"
+SURVEY_FILE = RESOURCES / "survey_data.csv"
+RANDOM_SURVEY_FILE = RESOURCES / "random_survey.csv"
+SCHEDULE_FILE = RESOURCES / "anonymized_courses.xlsx"
+MAPPING_FILE = RESOURCES / "survey_column_mapping.csv"
+
+STATUS_MAX_COURSE_MAP = {
+    1: 6,
+    2: 6,
+    3: 6,
+    4: 6,
+    5: 4,
+    6: 4,
+}
+STATUS_CRS_PREFIX_MAP = {
+    1: ["1", "2", "3"],
+    2: ["1", "2", "3", "4"],
+    3: ["1", "2", "3", "4", "5"],
+    4: ["2", "3", "4", "5", "6"],
+    5: ["5", "6"],
+    6: ["5", "6"],
+}
+
+
+class Pipeline:
+    """A survey loaded along with its course mapping, capacities, features and schedule
+
+    This is the setup shared by the scripts and the tests, which then build students from it.
+    """
+
+    def __init__(self, survey_file=SURVEY_FILE, cache=None, **kwargs):
+        """
+        Args:
+            survey_file (str | Path, optional): Survey CSV export or columnar file. Defaults to
+                SURVEY_FILE.
+            cache (Cache, optional): Where parsed inputs are stored. Defaults to None.
+            kwargs: Passed on to QSurvey
+        """
+        self.mp = qsurvey.QMapper(MAPPING_FILE, cache)
+        self.qd = qsurvey.QSchedule(SCHEDULE_FILE, cache)
+        self.crs_sec_cap_map = self.qd.capacities()
+        self.qs = qsurvey.QSurvey(
+            survey_file, self.mp, list(self.crs_sec_cap_map.keys()), **kwargs
+        )
+        self.course_map = self.mp.mapping(self.qs.all_courses)
+        self.all_courses = list(self.course_map.keys())
+        self.features, self.schedule = self.mp.features_and_schedule(
+            self.course_map, self.crs_sec_cap_map
+        )
+        self.relevance = qsurvey.StatusRelevance(
+            self.all_courses, self.course_map, STATUS_CRS_PREFIX_MAP
+        )
@@ -1,5 +1,4 @@
 import numpy as np
-from fair.stats.survey import Corpus, SingleTopicSurvey
 from matplotlib import pyplot as plt
 from sklearn.decomposition import PCA
 
@@ -8,9 +7,10 @@ import qsurvey
 NUM_RAND_SAMP = 20
 NUM_SUB_KERNELS = 3
 SAMPLE_PER_STUDENT = 10
-SPARSE = False
+SPARSE = None  # None chooses dense or sparse storage per constraint
+WORKERS = 6
 PLOT = True
-RNG = np.random.default_rng(None)
+seed = None
 pref_thresh = 5
 
 status_color_map = {
@@ -42,66 +42,10 @@ survey_file = "resources/random_survey.csv"
 schedule_file = "resources/anonymized_courses.xlsx"
 mapping_file = "resources/survey_column_mapping.csv"
 
-mp = qsurvey.QMapper(mapping_file)
-qd = qsurvey.QSchedule(schedule_file)
-crs_sec_cap_map = qd.capacities()
-qs = qsurvey.QSurvey(survey_file, mp, list(crs_sec_cap_map.keys()))
-course_map = mp.mapping(qs.all_courses)
-all_courses = [crs for crs in course_map.keys()]
-features = mp.features(course_map)
-course, slot, weekday, section = features
-schedule = mp.schedule(course_map, crs_sec_cap_map, features)
-students, responses, statuses = qs.students(
-    course_map,
-    all_courses,
-    features,
-    schedule,
-    status_max_course_map,
-    pref_thresh,
-    SPARSE,
-)
-student_status_map = {students[i]: status for i, status in enumerate(statuses)}
-student_resp_map = {students[i]: response for i, response in enumerate(responses)}
-course_cap_map = {
-    crs: crs_sec_cap_map[course_map[crs]["course num"]][int(course_map[crs]["section"])]
-    for crs in all_courses
-}
-students = [
-    student for student in students if len(student.student.preferred_courses) > 0
-]
-
-status_mbeta_map = {}
-status_surveys_map = {}
-status_students_map = {}
-for status in range(1, 7):
-    relevant_idxs = qsurvey.get_status_relevant(
-        status, all_courses, course_map, status_crs_prefix_map
-    )
-    status_students = [
-        student for student in students if student_status_map[student] == status
-    ]
-    status_students_map[status] = status_students
-    status_surveys = [
-        SingleTopicSurvey(
-            [sch for i, sch in enumerate(schedule) if i in relevant_idxs],
-            student_resp_map[student][relevant_idxs],
-            student.student.total_courses,
-            1,
-            8,
-        )
-        for student in status_students
-    ]
-    status_corpus = Corpus(status_surveys, RNG)
-    status_mbeta = status_corpus.kde_distribution(SAMPLE_PER_STUDENT, NUM_SUB_KERNELS)
-    status_mbeta_map[status] = status_mbeta
-    status_surveys_map[status] = status_surveys
-
 
 def project_data(status_data_map, course_map):
     pca = PCA(n_components=2)
-    data_matrix = np.vstack(
-        [status_data_map[status] for status in qsurvey.STATUS_LABEL_MAP.keys()]
-    )
+    data_matrix = np.vstack([status_data_map[status] for status in status_data_map])
     # sign posts
     import re
 
@@ -120,7 +64,7 @@ def project_data(status_data_map, course_map):
 
     proj_data_map = {}
     start = 7
-    for status in qsurvey.STATUS_LABEL_MAP.keys():
+    for status in status_data_map:
         stop = start + len(status_data_map[status])
         proj_data_map[status] = data[start:stop][:]
         start = stop
@@ -131,7 +75,7 @@ def project_data(status_data_map, course_map):
 def project_data_ind(status_data_map):
     pca = PCA(n_components=2)
     proj_data_map = {}
-    for status in qsurvey.STATUS_LABEL_MAP.keys():
+    for status in status_data_map:
         proj_data_map[status] = pca.fit_transform(np.vstack(status_data_map[status]))
 
     return proj_data_map
@@ -158,41 +102,57 @@ def plot_data(status, data, num_students):
     # plt.tick_params(labelbottom=False, labelleft=False)
 
 
-status_synth_students_map = {}
-status_data_map = {}
-for status in qsurvey.STATUS_LABEL_MAP.keys():
-    synth_students, data = qsurvey.synthesize_students(
-        NUM_RAND_SAMP,
-        course,
-        section,
-        features,
-        schedule,
+def main():
+    cache = qsurvey.Cache()
+    mp = qsurvey.QMapper(mapping_file, cache)
+    qd = qsurvey.QSchedule(schedule_file, cache)
+    crs_sec_cap_map = qd.capacities()
+    qs = qsurvey.QSurvey(survey_file, mp, list(crs_sec_cap_map.keys()))
+    course_map = mp.mapping(qs.all_courses)
+    all_courses = [crs for crs in course_map.keys()]
+    features, schedule = mp.features_and_schedule(course_map, crs_sec_cap_map)
+
+    relevance = qsurvey.StatusRelevance(all_courses, course_map, status_crs_prefix_map)
+    population = qsurvey.build_population(
         qs,
-        status_surveys_map[status],
-        status_mbeta_map[status],
+        schedule,
+        NUM_RAND_SAMP,
         course_map,
-        status_max_course_map[status],
-        qsurvey.get_status_relevant(
-            status, all_courses, course_map, status_crs_prefix_map
-        ),
-        rng=RNG,
-        pref_thresh=pref_thresh,
-        total_course_list=[
-            student.student.total_courses for student in status_students_map[status]
-        ],
+        features,
+        relevance,
+        status_max_course_map,
+        pref_thresh,
+        SAMPLE_PER_STUDENT,
+        NUM_SUB_KERNELS,
+        seed=seed,
+        cache=cache,
+        workers=WORKERS,
+        sparse=SPARSE,
     )
-    status_synth_students_map[status] = synth_students
-    status_data_map[status] = data
-
-proj_data_map, sign_data = project_data(status_data_map, course_map)
-
-if PLOT:
-    for status in qsurvey.STATUS_LABEL_MAP.keys():
-        plot_data(status, proj_data_map[status], len(status_students_map[status]))
-    plt.legend(loc="best")
-    for i in range(6):
-        x, y = sign_data[i, 0], sign_data[i, 1]
-        plt.scatter(x, y, c="ghostwhite", s=1, alpha=0.5)
-        plt.annotate(f"{i+1}00s", xy=(x, y), xytext=(x, y))
-    plt.title("Actual students (large circles) and synthetic students (small circles)")
-    plt.show()
+
+    status_data_map = {}
+    status_num_actual_map = {}
+    for status in np.unique(population.statuses):
+        rows = population.statuses == status
+        # actual students precede the synthetic students of each status
+        status_data_map[status] = population.status_responses(status, relevance)
+        status_num_actual_map[status] = int(np.sum(rows & ~population.synthetic))
+
+    proj_data_map, sign_data = project_data(status_data_map, course_map)
+
+    if PLOT:
+        for status in proj_data_map:
+            plot_data(status, proj_data_map[status], status_num_actual_map[status])
+        plt.legend(loc="best")
+        for i in range(6):
+            x, y = sign_data[i, 0], sign_data[i, 1]
+            plt.scatter(x, y, c="ghostwhite", s=1, alpha=0.5)
+            plt.annotate(f"{i+1}00s", xy=(x, y), xytext=(x, y))
+        plt.title(
+            "Actual students (large circles) and synthetic students (small circles)"
+        )
+        plt.show()
+
+
+if __name__ == "__main__":
+    main()
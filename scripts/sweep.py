@@ -0,0 +1,91 @@
+import numpy as np
+from fair.allocation import general_yankee_swap_E, round_robin, serial_dictatorship
+from fair.metrics import nash_welfare, utilitarian_welfare
+
+import qsurvey
+
+SEEDS = range(100)
+NUM_STUDENTS = [250, 500, 1000]
+PREF_THRESH = [5, 10]
+WORKERS = 8
+SPARSE = None  # None chooses dense or sparse storage per constraint
+RESULTS_FILE = "sweep_results.sqlite"
+
+algorithms = {
+    "YS": general_yankee_swap_E,
+    "RR": round_robin,
+    "SD": serial_dictatorship,
+}
+metrics = {
+    "utilitarian welfare": utilitarian_welfare,
+    "Nash welfare": nash_welfare,
+}
+status_max_course_map = {
+    1: 6,
+    2: 6,
+    3: 6,
+    4: 6,
+    5: 4,
+    6: 4,
+}
+
+survey_file = "resources/survey_data.csv"
+schedule_file = "resources/anonymized_courses.xlsx"
+mapping_file = "resources/survey_column_mapping.csv"
+
+
+def allocate(context, seed, num_students, pref_thresh):
+    """Allocate to num_students students resampled from the survey respondents"""
+    population = context["populations"][pref_thresh]
+    rng = np.random.default_rng(seed)
+    has_preferred = np.diff(population.preferred.indptr) > 0
+    idxs = rng.choice(np.flatnonzero(has_preferred), num_students)
+    students = [student.materialize() for student in population.subset(idxs)]
+    results, _ = qsurvey.run_experiments(
+        algorithms, metrics, students, context["schedule"]
+    )
+
+    return results
+
+
+def main():
+    # built once and shared by every cell of the sweep
+    cache = qsurvey.Cache()
+    mp = qsurvey.QMapper(mapping_file, cache)
+    qd = qsurvey.QSchedule(schedule_file, cache)
+    crs_sec_cap_map = qd.capacities()
+    qs = qsurvey.QSurvey(survey_file, mp, list(crs_sec_cap_map.keys()))
+    course_map = mp.mapping(qs.all_courses)
+    all_courses = [crs for crs in course_map.keys()]
+    features, schedule = mp.features_and_schedule(course_map, crs_sec_cap_map)
+    context = {
+        "populations": {
+            pref_thresh: qsurvey.StudentPopulation.from_survey(
+                qs,
+                course_map,
+                all_courses,
+                features,
+                schedule,
+                status_max_course_map,
+                pref_thresh,
+                sparse=SPARSE,
+            )
+            for pref_thresh in PREF_THRESH
+        },
+        "schedule": schedule,
+    }
+
+    store = qsurvey.ResultStore(RESULTS_FILE)
+    grid = {"seed": SEEDS, "num_students": NUM_STUDENTS, "pref_thresh": PREF_THRESH}
+    results = qsurvey.run_sweep(allocate, grid, store, context, WORKERS)
+    store.close()
+
+    print(
+        results.groupby(["algorithm", "metric", "num_students", "pref_thresh"])[
+            "value"
+        ].describe()
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -3,7 +3,7 @@ from fair.metrics import utilitarian_welfare
 
 import qsurvey
 
-SPARSE = False
+SPARSE = None  # None chooses dense or sparse storage per constraint
 pref_thresh = 10
 
 status_max_course_map = {
@@ -19,15 +19,15 @@ survey_file = "resources/random_survey.csv"
 schedule_file = "resources/anonymized_courses.xlsx"
 mapping_file = "resources/survey_column_mapping.csv"
 
-mp = qsurvey.QMapper(mapping_file)
-qd = qsurvey.QSchedule(schedule_file)
+cache = qsurvey.Cache()
+mp = qsurvey.QMapper(mapping_file, cache)
+qd = qsurvey.QSchedule(schedule_file, cache)
 crs_sec_cap_map = qd.capacities()
 qs = qsurvey.QSurvey(survey_file, mp, list(crs_sec_cap_map.keys()))
 course_map = mp.mapping(qs.all_courses)
 all_courses = [crs for crs in course_map.keys()]
-features = mp.features(course_map)
+features, schedule = mp.features_and_schedule(course_map, crs_sec_cap_map)
 course, slot, weekday, _ = features
-schedule = mp.schedule(course_map, crs_sec_cap_map, features)
 students, responses, statuses = qs.students(
     course_map,
     all_courses,
@@ -39,10 +39,11 @@ students, responses, statuses = qs.students(
 )
 student_status_map = {students[i]: status for i, status in enumerate(statuses)}
 student_resp_map = {students[i]: response for i, response in enumerate(responses)}
-course_cap_map = {
-    crs: crs_sec_cap_map[course_map[crs]["course num"]][int(course_map[crs]["section"])]
-    for crs in all_courses
-}
+capacities, _ = qd.capacity_index().lookup(
+    [course_map[crs]["course num"] for crs in all_courses],
+    [course_map[crs]["section"] for crs in all_courses],
+)
+course_cap_map = dict(zip(all_courses, capacities))
 students = [
     student for student in students if len(student.student.preferred_courses) > 0
 ]
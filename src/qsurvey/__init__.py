@@ -1,7 +1,10 @@
-import re
+import io
+import math
+import pickle
 import sys
 import warnings
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 
 import numpy as np
 import pandas as pd
@@ -15,11 +18,34 @@ from fair.constraint import (
 from fair.feature import Course, Section, Slot, Weekday, slots_for_time_range
 from fair.item import ScheduleItem
 from fair.valuation import ConstraintSatifactionValuation
-from scipy.stats import multinomial
+from scipy.sparse import issparse
 
 from qsurvey import parser
+from qsurvey.cache import Cache, file_digest
+from qsurvey.columnar import (
+    ColumnarSurvey,
+    ColumnarWriter,
+    classify_columns,
+    convert_survey,
+    is_columnar,
+)
+from qsurvey.experiment import allocation_matrix, run_experiments
+from qsurvey.kde import (
+    build_surveys,
+    fit_distribution,
+    fit_status_distributions,
+    reseed_distribution,
+)
+from qsurvey.sweep import ResultStore, expand_grid, run_sweep
 
 DEFAULT_CAPACITY = 30
+RESPONSE_ID = "ResponseId"
+# nullable dtype of course ratings read in streaming mode
+RATING_DTYPE = "UInt8"
+# constraint matrices with at least SPARSE_MIN_ENTRIES entries, of which at most a fraction
+# SPARSE_MAX_DENSITY is non-zero, are stored sparse when sparse=None (automatic selection)
+SPARSE_MIN_ENTRIES = 512
+SPARSE_MAX_DENSITY = 0.25
 STATUS_LABEL_MAP = {
     1: "Fresh",
     2: "Soph",
@@ -30,15 +56,64 @@ STATUS_LABEL_MAP = {
 }
 
 
+class StatusRelevance:
+    """Boolean (status x course) matrix of the courses relevant to each status"""
+
+    def __init__(self, all_courses, course_map, status_crs_prefix_map):
+        """
+        Args:
+            all_courses (list[str]): Survey columns of the courses, in response order
+            course_map (dict): Course information for each survey column
+            status_crs_prefix_map (dict): Leading course number digits relevant to each status
+        """
+        first_digits = np.array(
+            [course_map[course]["course num"][0] for course in all_courses]
+        )
+        self.statuses = list(status_crs_prefix_map.keys())
+        self._rows = {status: i for i, status in enumerate(self.statuses)}
+        self.matrix = np.array(
+            [
+                np.isin(first_digits, list(prefixes))
+                for prefixes in status_crs_prefix_map.values()
+            ],
+            dtype=bool,
+        ).reshape(len(self.statuses), len(all_courses))
+
+    def mask(self, status):
+        return self.matrix[self._rows[status]]
+
+    def indices(self, status):
+        return np.flatnonzero(self.mask(status))
+
+
 def get_status_relevant(status, all_courses, course_map, status_crs_prefix_map):
-    relevant_courses = [
-        course
-        for course in all_courses
-        if course_map[course]["course num"][0] in status_crs_prefix_map[status]
-    ]
-    relevant_idxs = [all_courses.index(course) for course in relevant_courses]
+    relevance = StatusRelevance(all_courses, course_map, status_crs_prefix_map)
+
+    return relevance.indices(status).tolist()
+
+
+def map_values(mapping, keys):
+    """Look up every entry of keys in mapping
+
+    Args:
+        mapping (dict): Mapping with numeric keys
+        keys (np.ndarray): Keys to look up
 
-    return relevant_idxs
+    Raises:
+        KeyError: If any key is missing from mapping
+
+    Returns:
+        np.ndarray: Values of mapping in the order of keys
+    """
+    sorted_keys = np.array(sorted(mapping.keys()))
+    sorted_values = np.array([mapping[key] for key in sorted_keys])
+    keys = np.asarray(keys)
+    pos = np.clip(np.searchsorted(sorted_keys, keys), 0, len(sorted_keys) - 1)
+    missing = sorted_keys[pos] != keys
+    if missing.any():
+        raise KeyError(keys[missing][0])
+
+    return sorted_values[pos]
 
 
 def scale_up_responses(responses, relevant_idxs, n):
@@ -70,6 +145,244 @@ def top_preferred(course_map, schedule, course, response, pref_thresh):
     return preferred_courses
 
 
+def batch_top_preferred(course_map, responses, pref_thresh):
+    """Select the preferred items of every row of responses at once
+
+    Produces the same items, in the same order, as calling top_preferred on each row
+    separately: rating levels are visited from highest to lowest and a level is taken
+    in full whenever it contains a course number that has not been selected yet.
+    Selection stops once pref_thresh course numbers are covered or the rating 1 level
+    is reached.
+
+    Args:
+        course_map (dict): Course information for each survey column
+        responses (np.ndarray): A (students x courses) matrix of ratings
+        pref_thresh (int): Number of distinct preferred course numbers per student
+
+    Returns:
+        list[np.ndarray]: Indices of the preferred items for each row of responses
+    """
+    responses = np.asarray(responses)
+    num_rows = responses.shape[0]
+    if num_rows == 0:
+        return []
+    _, course_codes = np.unique(
+        [entry["course num"] for entry in course_map.values()], return_inverse=True
+    )
+    order = np.argsort(responses, axis=1)[:, ::-1]
+    values = np.take_along_axis(responses, order, axis=1)
+    codes = course_codes[order]
+    # rating levels are contiguous runs of equal values in each sorted row
+    levels = np.zeros(values.shape, dtype=int)
+    levels[:, 1:] = np.cumsum(values[:, 1:] != values[:, :-1], axis=1)
+
+    rows = np.broadcast_to(np.arange(num_rows)[:, None], values.shape)
+    seen = np.zeros((num_rows, len(course_map)), dtype=bool)
+    selected = np.zeros(values.shape, dtype=bool)
+    active = np.ones(num_rows, dtype=bool)
+    for level in range(levels.max() + 1):
+        members = levels == level
+        present = members.any(axis=1)
+        level_value = values[np.arange(num_rows), np.argmax(members, axis=1)]
+        active &= ~(present & ((seen.sum(axis=1) >= pref_thresh) | (level_value == 1)))
+        unseen = members & ~np.take_along_axis(seen, codes, axis=1)
+        # NaN ratings never equal themselves and are therefore never selected
+        added = active & unseen.any(axis=1) & (level_value == level_value)
+        added_members = members & added[:, None]
+        selected |= added_members
+        seen[rows[added_members], codes[added_members]] = True
+
+    return np.split(order[selected], np.cumsum(selected.sum(axis=1))[:-1])
+
+
+def _draw_samples(distribution, num_samples, batched=True):
+    if batched:
+        return np.atleast_2d(distribution.sample(num_samples))
+
+    return np.vstack([distribution.sample() for _ in range(num_samples)])
+
+
+def sample_responses(
+    distribution,
+    num_samples,
+    relevant_idxs,
+    n,
+    block_size=None,
+    max_block_size=100_000,
+    batched=True,
+):
+    """Draw denormalized synthetic responses, rejecting those without any preference
+
+    Samples are drawn in blocks, scaled up to all n courses and denormalized to the 1-8
+    rating scale in place, and rows consisting entirely of ones are rejected with a mask.
+    The size of each block is adapted to the acceptance rate observed so far. Accepted rows
+    keep the order in which they were drawn.
+
+    Args:
+        distribution: Fitted distribution whose sample method returns rows of normalized responses
+        num_samples (int): Number of responses to generate
+        relevant_idxs (list[int]): Columns of the full response matrix covered by distribution
+        n (int): Total number of courses
+        block_size (int, optional): Size of the first block. Defaults to None, in which case
+            num_samples is used.
+        max_block_size (int, optional): Upper bound on the size of a block. Defaults to 100_000.
+        batched (bool, optional): Draw each block with a single distribution.sample(size) call.
+            Defaults to True. Pass False for distributions whose sample method only draws a
+            single row, which is then called once per row.
+
+    Returns:
+        np.ndarray: A (num_samples x n) matrix of responses
+    """
+    responses = np.empty((num_samples, n))
+    num_drawn, num_accepted = 0, 0
+    block_size = num_samples if block_size is None else block_size
+    while num_accepted < num_samples:
+        sdata = _draw_samples(
+            distribution, max(1, min(block_size, max_block_size)), batched
+        )
+        num_drawn += sdata.shape[0]
+        block = np.zeros((sdata.shape[0], n))
+        block[:, relevant_idxs] = sdata
+        # denormalize synthetic data
+        block *= 7
+        np.round(block, out=block)
+        block += 1
+        accepted = block[block.max(axis=1) > 1][: num_samples - num_accepted]
+        responses[num_accepted : num_accepted + len(accepted)] = accepted
+        num_accepted += len(accepted)
+
+        # oversize the next block according to the acceptance rate observed so far
+        acceptance = max(num_accepted, 1) / num_drawn
+        block_size = math.ceil(1.1 * (num_samples - num_accepted) / acceptance)
+
+    return responses
+
+
+def iter_synthetic_responses(
+    distribution,
+    num_samples,
+    relevant_idxs,
+    n,
+    batch_size=1000,
+    responses_file=None,
+    batched=True,
+):
+    """Lazily draw denormalized synthetic responses in batches
+
+    Only a single batch of responses is held at a time unless the caller keeps them. When
+    responses_file is given, the responses of all batches are additionally written to a
+    memory-mapped .npy file of shape (num_samples x n) and the yielded responses are views
+    into that file.
+
+    Args:
+        distribution: Fitted distribution of normalized responses
+        num_samples (int): Total number of synthetic responses
+        relevant_idxs (list[int]): Columns of the full response matrix covered by distribution
+        n (int): Total number of courses
+        batch_size (int, optional): Responses per batch. Defaults to 1000.
+        responses_file (str | Path, optional): .npy file the responses are spilled to. Defaults to None.
+        batched (bool, optional): Draw many rows per distribution.sample call (see
+            sample_responses). Defaults to True.
+
+    Yields:
+        np.ndarray: A (batch x n) matrix of responses
+    """
+    spilled = None
+    if responses_file is not None:
+        spilled = np.lib.format.open_memmap(
+            responses_file, mode="w+", dtype=float, shape=(num_samples, n)
+        )
+
+    for start in range(0, num_samples, batch_size):
+        stop = min(start + batch_size, num_samples)
+        responses = sample_responses(
+            distribution, stop - start, relevant_idxs, n, batched=batched
+        )
+        if spilled is not None:
+            spilled[start:stop] = responses
+            spilled.flush()
+            responses = spilled[start:stop]
+
+        yield responses
+
+
+def iter_synthetic_students(
+    num_samples,
+    course,
+    section,
+    features,
+    schedule,
+    qs,
+    distribution,
+    course_map,
+    max_courses,
+    relevant_idxs,
+    rng,
+    pref_thresh,
+    total_course_list,
+    batch_size=1000,
+    responses_file=None,
+    workers=None,
+    batched=True,
+):
+    """Lazily generate synthetic students in batches
+
+    Only a single batch of responses and students is held at a time unless the caller keeps
+    them. When responses_file is given, the responses of all batches are additionally written
+    to a memory-mapped .npy file of shape (num_samples x courses) and the yielded responses
+    are views into that file.
+
+    Args:
+        num_samples (int): Total number of synthetic students
+        course (Course): Course feature
+        section (Section): Section feature
+        features (list[Feature]): Course, slot, weekday and section features
+        schedule (list[ScheduleItem]): All items in the schedule
+        qs (QSurvey): Survey providing the shared global constraints
+        distribution: Fitted distribution of normalized responses
+        course_map (dict): Course information for each survey column
+        max_courses (int): Total courses that can be assigned to a student
+        relevant_idxs (list[int]): Columns of the full response matrix covered by distribution
+        rng (np.random.Generator): Random number generator
+        pref_thresh (int): Number of distinct preferred course numbers per student
+        total_course_list (list[int]): Total courses desired by the actual students
+        batch_size (int, optional): Students per batch. Defaults to 1000.
+        responses_file (str | Path, optional): .npy file the responses are spilled to. Defaults to None.
+        workers (int, optional): Number of processes used to construct students. Defaults to None.
+        batched (bool, optional): Draw many rows per distribution.sample call (see
+            sample_responses). Defaults to True.
+
+    Yields:
+        tuple[np.ndarray, list[SurveyStudent]]: Responses and students of the next batch
+    """
+    global_constraints = qs.global_constraints(features, schedule)
+
+    for responses in iter_synthetic_responses(
+        distribution,
+        num_samples,
+        relevant_idxs,
+        len(course_map),
+        batch_size,
+        responses_file,
+        batched,
+    ):
+        students = SurveyStudent.from_responses(
+            responses,
+            total_course_list,
+            course,
+            section,
+            course_map,
+            global_constraints,
+            schedule,
+            rng=rng,
+            pref_thresh=pref_thresh,
+            max_total_courses=max_courses,
+            workers=workers,
+        )
+
+        yield responses, students
+
+
 def synthesize_students(
     num_samples,
     course,
@@ -85,50 +398,337 @@ def synthesize_students(
     rng,
     pref_thresh,
     total_course_list,
+    batched=True,
 ):
-    num_students = len(surveys)
     data = np.vstack([survey.data() for survey in surveys])
     data = scale_up_responses(data, relevant_idxs, len(course_map))
     # denormalize data
     data = 7 * data + 1
-    # generate synthetic samples
-    synth_data = []
-    while len(synth_data) < num_samples:
-        sdata = distribution.sample()
-        sdata = scale_up_responses(sdata, relevant_idxs, len(course_map))
-        # denormalize synthetic data
-        sdata = np.round(7 * sdata) + 1
-        if sdata.max() == 1:
-            continue
-        synth_data.append(sdata)
-    synth_data = np.vstack(synth_data)
-    data = np.vstack([data, synth_data])
-    students = SurveyStudent.from_responses(
-        data[num_students:],
-        total_course_list,
-        course,
-        section,
-        course_map,
-        [
-            qs.course_time_constr(features, schedule),
-            qs.course_sect_constr(features, schedule),
-        ],
-        schedule,
-        rng=rng,
-        pref_thresh=pref_thresh,
-        max_total_courses=max_courses,
+    # generate synthetic samples and students in a single batch
+    synth_data, students = next(
+        iter_synthetic_students(
+            num_samples,
+            course,
+            section,
+            features,
+            schedule,
+            qs,
+            distribution,
+            course_map,
+            max_courses,
+            relevant_idxs,
+            rng,
+            pref_thresh,
+            total_course_list,
+            batch_size=max(num_samples, 1),
+            batched=batched,
+        ),
+        (np.empty((0, len(course_map))), []),
     )
+    data = np.vstack([data, synth_data])
 
     return students, data
 
 
+def sample_total_courses(total_course_list, size, rng, max_total_courses=sys.maxsize):
+    """Draw total courses from the empirical distribution of total_course_list in one call
+
+    Args:
+        total_course_list (list[int]): Observed total courses, clamped to [1, max_total_courses]
+        size (int): Number of draws
+        rng (np.random.Generator): Random number generator
+        max_total_courses (int, optional): Upper bound on total courses. Defaults to sys.maxsize.
+
+    Returns:
+        np.ndarray: The drawn total courses
+    """
+    total_course_list = np.clip(np.asarray(total_course_list), 1, max_total_courses)
+    classes, counts = np.unique(total_course_list, return_counts=True)
+
+    return rng.choice(classes, size=size, p=counts / counts.sum())
+
+
+def sample_total_courses_by_status(
+    status_total_course_map, statuses, rng, max_total_courses=sys.maxsize
+):
+    """Draw total courses separately for the students of each status
+
+    Args:
+        status_total_course_map (dict[int, list[int]]): Observed total courses for each status
+        statuses (np.ndarray): Status of each student
+        rng (np.random.Generator): Random number generator
+        max_total_courses (int, optional): Upper bound on total courses. Defaults to sys.maxsize.
+
+    Returns:
+        np.ndarray: The drawn total courses, in the order of statuses
+    """
+    statuses = np.asarray(statuses)
+    total_courses = np.zeros(len(statuses), dtype=int)
+    for status in np.unique(statuses):
+        stratum = statuses == status
+        total_courses[stratum] = sample_total_courses(
+            status_total_course_map[status],
+            stratum.sum(),
+            rng,
+            max_total_courses,
+        )
+
+    return total_courses
+
+
+def course_section_values(schedule, course, section):
+    """Compute the (course, section) value pair of every item in schedule
+
+    Args:
+        schedule (list[ScheduleItem]): All items in the schedule
+        course (Course): Course feature
+        section (Section): Section feature
+
+    Returns:
+        list[tuple]: The (course, section) pair of each item, in schedule order
+    """
+    return [(item.value(course), item.value(section)) for item in schedule]
+
+
+def use_sparse(nnz, shape, sparse=None):
+    """Decide whether a constraint matrix should be stored sparse
+
+    Args:
+        nnz (int): Number of non-zero entries of the matrix
+        shape (tuple[int, int]): Shape of the matrix
+        sparse (bool, optional): Explicit choice, returned unchanged. Defaults to None,
+            in which case the matrix is stored sparse if it has at least SPARSE_MIN_ENTRIES
+            entries and a density of at most SPARSE_MAX_DENSITY.
+
+    Returns:
+        bool: Should the matrix be stored sparse
+    """
+    if sparse is not None:
+        return bool(sparse)
+    size = shape[0] * shape[1]
+
+    return size >= SPARSE_MIN_ENTRIES and nnz <= SPARSE_MAX_DENSITY * size
+
+
+def global_constraint_sparsity(features, schedule, sparse=None):
+    """Choose the storage of the course time and course section constraints of schedule
+
+    The number of non-zero entries is counted from the schedule items: the course time
+    constraint has an entry for every slot and weekday an item meets on, the course section
+    constraint a single entry per item.
+
+    Args:
+        features (list[Feature]): Course, slot, weekday and section features
+        schedule (list[ScheduleItem]): All items in the schedule
+        sparse (bool, optional): Explicit choice for both constraints. Defaults to None (automatic).
+
+    Returns:
+        tuple[bool, bool]: Should the course time and course section constraints be sparse
+    """
+    if sparse is not None:
+        return bool(sparse), bool(sparse)
+    course, slot, weekday, _ = features
+    time_nnz = sum(
+        len(item.value(slot)) * len(item.value(weekday)) for item in schedule
+    )
+    num_courses = len({item.value(course) for item in schedule})
+
+    return (
+        use_sparse(time_nnz, (len(slot.times) * len(weekday.days), len(schedule))),
+        use_sparse(len(schedule), (num_courses, len(schedule))),
+    )
+
+
+def _array_nbytes(value):
+    if issparse(value):
+        return sum(
+            getattr(value, name).nbytes
+            for name in ("data", "indices", "indptr", "row", "col", "offsets")
+            if hasattr(value, name)
+        )
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+
+    return 0
+
+
+def constraint_nbytes(constraint):
+    """Bytes held by the dense or sparse arrays of a constraint
+
+    Args:
+        constraint (LinearConstraint): The constraint
+
+    Returns:
+        int: Total size of the array attributes of constraint
+    """
+    return sum(
+        _array_nbytes(value) for value in getattr(constraint, "__dict__", {}).values()
+    )
+
+
+def is_sparse_constraint(constraint):
+    return any(
+        issparse(value) for value in getattr(constraint, "__dict__", {}).values()
+    )
+
+
+def constraint_memory(students):
+    """Report the memory held by the constraints of a population of students
+
+    Constraints shared between students, such as the global constraints, are counted once.
+    StudentViews that have not been materialized are skipped.
+
+    Args:
+        students (Iterable[SurveyStudent | LegacyStudent | StudentView]): The students
+
+    Returns:
+        dict[str, int]: Number of "students" inspected, bytes held by "global" and by per
+            "student" constraints and their "total", and the number of "dense" and "sparse"
+            constraints
+    """
+    report = {"students": 0, "global": 0, "student": 0, "dense": 0, "sparse": 0}
+    seen = set()
+
+    def count(constraint, kind):
+        if id(constraint) in seen:
+            return
+        seen.add(id(constraint))
+        report[kind] += constraint_nbytes(constraint)
+        report["sparse" if is_sparse_constraint(constraint) else "dense"] += 1
+
+    for student in students:
+        if isinstance(student, StudentView):
+            if not student.materialized:
+                continue
+            student = student.materialize()
+        if isinstance(student, LegacyStudent):
+            student = student.student
+        report["students"] += 1
+        for constraint in student.global_constraints:
+            count(constraint, "global")
+        for constraint in (
+            student.all_courses_constraint,
+            student.undesirable_courses_constraint,
+            student.preferred_courses_constraint,
+        ):
+            count(constraint, "student")
+    report["total"] = report["global"] + report["student"]
+
+    return report
+
+
+def schedule_positions(items, schedule):
+    """Find the position in schedule of each of items
+
+    Items are matched by identity first and by equality otherwise, so items equal to but not
+    the same objects as those of schedule, e.g. from an unpickled or cached schedule, are found.
+
+    Args:
+        items (list[ScheduleItem]): Items to look up
+        schedule (list[ScheduleItem]): All items in the schedule
+
+    Raises:
+        ValueError: If an item is not in schedule
+
+    Returns:
+        list[int]: The position of each item in schedule
+    """
+    positions = {id(item): i for i, item in enumerate(schedule)}
+    idxs = []
+    for item in items:
+        idx = positions.get(id(item))
+        if idx is None:
+            try:
+                idx = schedule.index(item)
+            except ValueError:
+                raise ValueError(f"Item {item} is not in the schedule") from None
+        idxs.append(idx)
+
+    return idxs
+
+
+class ConstraintRegistry:
+    """Per-schedule data built once per (schedule, features) pair and shared by all students"""
+
+    def __init__(self):
+        self._entries = {}
+
+    def _lookup(self, kind, features, schedule, build, *args):
+        # the entry keeps features and schedule alive so that their ids stay unique
+        key = (
+            kind,
+            tuple(id(feature) for feature in features),
+            tuple(id(item) for item in schedule),
+            *args,
+        )
+        if key not in self._entries:
+            self._entries[key] = (features, schedule, build())
+
+        return self._entries[key][2]
+
+    def get(self, features, schedule, sparse=None):
+        """Return the course time and course section constraints for schedule
+
+        Constraints are constructed on first request and reused afterwards. The registry
+        holds references to features and schedule so that their identities remain valid
+        for the lifetime of the entry.
+
+        Args:
+            features (list[Feature]): Course, slot, weekday and section features
+            schedule (list[ScheduleItem]): All items in the schedule
+            sparse (bool, optional): Should sparse matrices be used for constraints. Defaults to None,
+                in which case it is chosen per constraint by global_constraint_sparsity.
+
+        Returns:
+            list[LinearConstraint]: The shared global constraints
+        """
+        course, slot, weekday, _ = features
+
+        def build():
+            # the storage is chosen from the whole schedule, so only on a miss
+            time_sparse, sect_sparse = global_constraint_sparsity(
+                features, schedule, sparse
+            )
+
+            return [
+                CourseTimeConstraint.from_items(schedule, slot, weekday, time_sparse),
+                MutualExclusivityConstraint.from_items(schedule, course, sect_sparse),
+            ]
+
+        return self._lookup("constraints", features, schedule, build, sparse)
+
+    def values(self, course, section, schedule):
+        """Return the shared (course, section) value pairs of schedule
+
+        Args:
+            course (Course): Course feature
+            section (Section): Section feature
+            schedule (list[ScheduleItem]): All items in the schedule
+
+        Returns:
+            list[tuple]: The (course, section) pair of each item, in schedule order
+        """
+        return self._lookup(
+            "values",
+            [course, section],
+            schedule,
+            lambda: course_section_values(schedule, course, section),
+        )
+
+    def clear(self):
+        self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
 class SurveyStudent(BaseAgent):
     """A manifestation of BaseAgent according to survey responses from a student"""
 
     @staticmethod
     def from_responses(
         responses: np.ndarray,
-        total_course_list: list[int],
+        total_course_list: list[int] | dict[int, list[int]],
         course: Course,
         section: Section,
         course_map,
@@ -137,117 +737,137 @@ class SurveyStudent(BaseAgent):
         rng: np.random.Generator,
         pref_thresh: int,
         max_total_courses: int = sys.maxsize,
-        sparse: bool = False,
+        sparse: bool = None,
         memoize: bool = True,
+        workers: int = None,
+        statuses: np.ndarray = None,
     ):
         """Create list of SurveyStudents from response vector and schedule of same dimension
 
-        The total courses assigned to a student are set by fitting a multinomial distribution
-        to the total_course_list provided. The total courses set for each student will range between
+        The total courses assigned to a student are drawn from the empirical distribution of the
+        total_course_list provided. The total courses set for each student will range between
         1 and max_total_courses unless max_total_courses is set to sys.maxsize in which case the
         distribution is still based on total_course_list, but it is not truncated on the upper tail.
+        All draws are made at once before any student is constructed.
 
         Args:
             responses (np.ndarray): Survey responses
-            total_course_list (list[int]): The total courses desired by each of the students in responses.
+            total_course_list (list[int] | dict[int, list[int]]): The total courses desired by each of the
+                students in responses, or by the students of each status when statuses is given.
             course (Course): Course feature
             global_constraints (list[LinearConstraint]): Previously constructed global constraints
             schedule (list[ScheduleItem]): A list of items corresponding to responses
             rng (np.random.Generator): Random number generator
             threshold (int, optional): What response value constitutes a preference for the item. Defaults to 1.
             max_total_courses (int, optional): Total courses that can be assigned to the student. Defaults to sys.maxsize.
-            sparse (bool, optional): Should sparse matrices be used for constraints. Defaults to False.
+            sparse (bool, optional): Should sparse matrices be used for constraints. Defaults to None,
+                in which case it is chosen per constraint from its density.
             memoize (bool, optional): Should results be cached. Defaults to True.
+            workers (int, optional): Number of processes used to construct students. Defaults to None,
+                in which case students are constructed in the calling process.
+            statuses (np.ndarray, optional): Status of each row of responses. When given, total courses
+                are drawn separately for each status from total_course_list[status]. Defaults to None.
 
         Returns:
             list[SurveyStudent]: A list of SurveyStudents constructed from responses
         """
-        total_course_list = [
-            max(1, min(max_total_courses, tot)) for tot in total_course_list
-        ]
-        classes, counts = np.unique(total_course_list, return_counts=True)
-        frequencies = counts / len(total_course_list)
-        dist = multinomial(1, frequencies)
-
-        students = []
-        for i in range(responses.shape[0]):
-            preferred_courses = top_preferred(
-                course_map, schedule, course, responses[i], pref_thresh
+        if statuses is None:
+            total_courses = sample_total_courses(
+                total_course_list, responses.shape[0], rng, max_total_courses
             )
-            total_courses = classes[np.argmax(dist.rvs(random_state=rng)[0])]
-
-            students.append(
-                SurveyStudent(
-                    preferred_courses,
-                    total_courses,
-                    course,
-                    section,
-                    global_constraints,
-                    schedule,
-                    sparse,
-                    memoize,
-                )
+        else:
+            total_courses = sample_total_courses_by_status(
+                total_course_list, statuses, rng, max_total_courses
             )
+        preferred_idxs = batch_top_preferred(course_map, responses, pref_thresh)
 
-        return students
+        return build_students(
+            zip(preferred_idxs, total_courses.tolist()),
+            course,
+            section,
+            global_constraints,
+            schedule,
+            course_section_values(schedule, course, section),
+            sparse=sparse,
+            memoize=memoize,
+            workers=workers,
+        )
 
     def __init__(
         self,
-        preferred_courses: list[ScheduleItem],
+        preferred_courses: list[ScheduleItem] | np.ndarray,
         total_courses: int,
         course: Course,
         section: Section,
         global_constraints: list[LinearConstraint],
         schedule: list[ScheduleItem],
-        sparse: bool = False,
+        sparse: bool = None,
         memoize: bool = True,
+        schedule_values: list[tuple] = None,
     ):
         """
         Args:
-            preferred_courses (list[ScheduleItem]): A list of course items preferred by the student
+            preferred_courses (list[ScheduleItem] | np.ndarray): The course items preferred by the student,
+                either as items, as indices into schedule or as a boolean mask over schedule
             total_courses (int): The maximum number of courses the student wishes to take
             course (Course): Feature for course
             global_constraints (List[LinearConstraint]): Constraints not specific to this agent
             schedule (List[ScheduleItem], optional): All possible items in the student's schedule. Defaults to None.
-            sparse (bool, optional): Should sparse matrices be used for constraints. Defaults to False.
+            sparse (bool, optional): Should sparse matrices be used for constraints. Defaults to None,
+                in which case it is chosen per constraint from its density.
             memoize (bool, optional): Should results be cached. Defaults to True
+            schedule_values (list[tuple], optional): Precomputed (course, section) pairs of schedule,
+                shared between students. Defaults to None, in which case they are computed here.
         """
+        if schedule_values is None:
+            schedule_values = course_section_values(schedule, course, section)
+
+        if len(preferred_courses) > 0 and isinstance(
+            preferred_courses[0], ScheduleItem
+        ):
+            preferred_idxs = schedule_positions(preferred_courses, schedule)
+        else:
+            preferred_courses = np.asarray(preferred_courses)
+            if preferred_courses.dtype == bool:
+                preferred_idxs = np.flatnonzero(preferred_courses)
+            else:
+                preferred_idxs = preferred_courses.astype(int)
+            preferred_courses = [schedule[i] for i in preferred_idxs]
+        preferred = np.zeros(len(schedule), dtype=bool)
+        preferred[preferred_idxs] = True
+        preferred_values = [schedule_values[i] for i in preferred_idxs]
+
+        undesirable_courses = [schedule_values[i] for i in np.flatnonzero(~preferred)]
+        shape = (1, len(schedule))
+
         self.preferred_courses = preferred_courses
         self.total_courses = total_courses
         self.quantities = [total_courses]
         self.preferred_topics = [preferred_courses]
+        self.global_constraints = global_constraints
 
-        all_courses = [(item.value(course), item.value(section)) for item in schedule]
         self.all_courses_constraint = PreferenceConstraint.from_item_lists(
             schedule,
-            [all_courses],
+            [schedule_values],
             [self.total_courses],
             [course, section],
-            sparse,
+            use_sparse(len(schedule_values), shape, sparse),
         )
 
-        undesirable_courses = [
-            (item.value(course), item.value(section))
-            for item in schedule
-            if item not in self.preferred_courses
-        ]
         self.undesirable_courses_constraint = PreferenceConstraint.from_item_lists(
             schedule,
             [undesirable_courses],
             [0],
             [course, section],
-            sparse,
+            use_sparse(len(undesirable_courses), shape, sparse),
         )
 
-        preferred_values = [
-            (item.value(course), item.value(section)) for item in self.preferred_courses
-        ]
         self.preferred_courses_constraint = PreferenceConstraint.from_item_lists(
             schedule,
             [preferred_values],
             [self.total_courses],
             [course, section],
-            sparse,
+            use_sparse(len(preferred_values), shape, sparse),
         )
 
         constraints = global_constraints + [
@@ -258,14 +878,230 @@ class SurveyStudent(BaseAgent):
         super().__init__(ConstraintSatifactionValuation(constraints, memoize))
 
 
+_WORKER_STATE = {}
+
+
+class _SharedPickler(pickle.Pickler):
+    """Pickle objects of shared as their key rather than by value"""
+
+    def __init__(self, file, shared):
+        super().__init__(file, pickle.HIGHEST_PROTOCOL)
+        self._keys = {id(value): key for key, value in shared.items()}
+
+    def persistent_id(self, obj):
+        return self._keys.get(id(obj))
+
+
+class _SharedUnpickler(pickle.Unpickler):
+    """Resolve the keys written by _SharedPickler to the objects of shared"""
+
+    def __init__(self, file, shared):
+        super().__init__(file)
+        self._shared = shared
+
+    def persistent_load(self, pid):
+        return self._shared[pid]
+
+
+def _shared_objects(state):
+    # every process derives the same keys from its own copy of the state
+    shared = {
+        key: state[key]
+        for key in ["course", "section", "global_constraints", "schedule"]
+    }
+    shared.update({("item", i): item for i, item in enumerate(state["schedule"])})
+    shared.update(
+        {
+            ("constraint", i): constraint
+            for i, constraint in enumerate(state["global_constraints"])
+        }
+    )
+
+    return shared
+
+
+def _init_student_worker(state):
+    _WORKER_STATE.update(state)
+    _WORKER_STATE["shared"] = _shared_objects(state)
+
+
+def _build_student_chunk(chunk, state=None):
+    if state is None:
+        state = _WORKER_STATE
+    course = state["course"]
+
+    students = []
+    for preferred_idxs, total_courses in chunk:
+        student = SurveyStudent(
+            preferred_idxs,
+            total_courses,
+            course,
+            state["section"],
+            state["global_constraints"],
+            state["schedule"],
+            state["sparse"],
+            state["memoize"],
+            state["schedule_values"],
+        )
+        if state["legacy"]:
+            student = LegacyStudent(student, student.preferred_courses, course)
+            student.student.valuation.valuation = student.student.valuation.compile()
+        students.append(student)
+
+    return students
+
+
+def _build_pickled_student_chunk(chunk):
+    f = io.BytesIO()
+    _SharedPickler(f, _WORKER_STATE["shared"]).dump(_build_student_chunk(chunk))
+
+    return f.getvalue()
+
+
+def build_students(
+    tasks,
+    course,
+    section,
+    global_constraints,
+    schedule,
+    schedule_values,
+    sparse=None,
+    memoize=True,
+    legacy=False,
+    workers=None,
+    chunk_size=None,
+):
+    """Construct SurveyStudents, optionally spreading the work over a process pool
+
+    The shared inputs are sent to each worker process once, when it starts, and tasks are
+    dispatched in chunks. Students are returned in the order of tasks regardless of the number
+    of workers. Workers send the features, schedule items and global constraints back as
+    references, so students built by workers hold the caller's objects just like students built
+    in the calling process.
+
+    Args:
+        tasks (Iterable[tuple]): A (preferred_idxs, total_courses) pair per student
+        course (Course): Course feature
+        section (Section): Section feature
+        global_constraints (list[LinearConstraint]): Constraints shared by all students
+        schedule (list[ScheduleItem]): All items in the schedule
+        schedule_values (list[tuple]): The (course, section) pair of each item in schedule
+        sparse (bool, optional): Should sparse matrices be used for constraints. Defaults to None,
+            in which case it is chosen per constraint from its density.
+        memoize (bool, optional): Should results be cached. Defaults to True.
+        legacy (bool, optional): Wrap each student in a LegacyStudent with a compiled valuation.
+            Defaults to False.
+        workers (int, optional): Number of worker processes. Defaults to None (no pool).
+        chunk_size (int, optional): Students per task sent to a worker. Defaults to None, in which
+            case each worker receives about four chunks.
+
+    Returns:
+        list[SurveyStudent | LegacyStudent]: The constructed students
+    """
+    tasks = list(tasks)
+    state = {
+        "course": course,
+        "section": section,
+        "global_constraints": global_constraints,
+        "schedule": schedule,
+        "schedule_values": schedule_values,
+        "sparse": sparse,
+        "memoize": memoize,
+        "legacy": legacy,
+    }
+    if workers is None or workers <= 1 or len(tasks) == 0:
+        return _build_student_chunk(tasks, state)
+
+    if chunk_size is None:
+        chunk_size = math.ceil(len(tasks) / (4 * workers))
+    chunks = [tasks[i : i + chunk_size] for i in range(0, len(tasks), chunk_size)]
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=_init_student_worker, initargs=(state,)
+    ) as pool:
+        shared = _shared_objects(state)
+        return [
+            student
+            for data in pool.map(_build_pickled_student_chunk, chunks)
+            for student in _SharedUnpickler(io.BytesIO(data), shared).load()
+        ]
+
+
+def read_survey_chunks(in_file, columns, courses, chunksize):
+    """Stream columns of a survey CSV export, holding course ratings as small integers
+
+    Only columns are parsed and each chunk of ratings is downcast to RATING_DTYPE before the
+    next chunk is read, so peak memory scales with the number of rows and courses rather than
+    with the size of the export.
+
+    Args:
+        in_file (str | Path): Survey CSV export
+        columns (list[str]): Columns to read
+        courses (list[str]): Course rating columns among columns
+        chunksize (int): Rows parsed at a time
+
+    Raises:
+        TypeError: If a course rating is not an integer that fits RATING_DTYPE
+
+    Returns:
+        pd.DataFrame: The requested columns of all rows
+    """
+    # a chunk sees too few rows to infer the type of the other columns, so they are read as text
+    # and converted once all rows are read
+    others = [col for col in columns if col not in set(courses)]
+    chunks = [
+        chunk.astype({crs: RATING_DTYPE for crs in courses})
+        for chunk in pd.read_csv(
+            in_file,
+            usecols=columns,
+            chunksize=chunksize,
+            dtype={col: str for col in others},
+        )
+    ]
+    if not chunks:
+        return pd.DataFrame(columns=columns)
+
+    df = pd.concat(chunks, ignore_index=True)[columns]
+    for col in others:
+        try:
+            df[col] = pd.to_numeric(df[col])
+        except (TypeError, ValueError):
+            pass
+
+    return df
+
+
 class QSurvey:
 
-    def __init__(self, in_file, mp, included_courses=None):
-        df = pd.read_csv(in_file)
+    def __init__(
+        self, in_file, mp, included_courses=None, registry=None, chunksize=None
+    ):
+        """
+        Args:
+            in_file (str | Path): Survey CSV export, or a .npz file in the columnar format, of
+                which only the questions and included course columns are read
+            mp (QMapper): Mapping of survey columns to courses
+            included_courses (list[str], optional): Course numbers to keep. Defaults to None,
+                in which case all courses are kept.
+            registry (ConstraintRegistry, optional): Registry of shared constraints. Defaults to
+                None, in which case a new registry is created.
+            chunksize (int, optional): Stream a CSV export this many rows at a time, parsing only
+                the questions and included course columns and holding ratings as small integers.
+                Defaults to None, in which case the export is parsed at once.
+        """
+        self.registry = ConstraintRegistry() if registry is None else registry
+        if is_columnar(in_file):
+            survey = ColumnarSurvey(in_file)
+            columns = survey.columns
+        elif chunksize is not None:
+            columns = list(pd.read_csv(in_file, nrows=0).columns)
+        else:
+            df = pd.read_csv(in_file)
+            columns = list(df.columns)
+        courses = survey.courses if is_columnar(in_file) else classify_columns(columns)
         self.questions = ["1", "2", "3", "4"] + [f"5#1_{i}" for i in range(1, 12)]
-        self.cics_courses = [col for col in df.columns if re.match("7 _\d+$", col)]
-        self.compsci_courses = [col for col in df.columns if re.match("7_\d+$", col)]
-        self.info_courses = [col for col in df.columns if re.match("7 _\d\.", col)]
+        self.cics_courses = courses["cics"]
+        self.compsci_courses = courses["compsci"]
+        self.info_courses = courses["info"]
         self.all_courses = self.cics_courses + self.compsci_courses + self.info_courses
         course_map = mp.mapping(self.all_courses)
         if included_courses is None:
@@ -278,18 +1114,36 @@ class QSurvey:
                 and course_map[crs]["course num"] in included_courses
             ]
         self.all_courses = [crs for crs in self.all_courses if crs in included_courses]
+        usecols = (
+            self.questions
+            + self.all_courses
+            + ([RESPONSE_ID] if RESPONSE_ID in columns else [])
+        )
+        if is_columnar(in_file):
+            df = survey.read(usecols)
+        elif chunksize is not None:
+            df = read_survey_chunks(in_file, usecols, self.all_courses, chunksize)
         self.df = df[self.questions + self.all_courses]
+        # respondents are identified by their ResponseId, or by their row when it is missing
+        self.response_ids = (
+            df[RESPONSE_ID] if RESPONSE_ID in columns else df.index.to_series()
+        ).to_numpy()
 
-    def course_time_constr(self, features, schedule, sparse=False):
+    def course_time_constr(self, features, schedule, sparse=None):
         _, slot, weekday, _ = features
+        sparse, _ = global_constraint_sparsity(features, schedule, sparse)
 
         return CourseTimeConstraint.from_items(schedule, slot, weekday, sparse)
 
-    def course_sect_constr(self, features, schedule, sparse=False):
+    def course_sect_constr(self, features, schedule, sparse=None):
         course, _, _, _ = features
+        _, sparse = global_constraint_sparsity(features, schedule, sparse)
 
         return MutualExclusivityConstraint.from_items(schedule, course, sparse)
 
+    def global_constraints(self, features, schedule, sparse=None):
+        return self.registry.get(features, schedule, sparse)
+
     def students(
         self,
         course_map,
@@ -298,97 +1152,279 @@ class QSurvey:
         schedule,
         status_max_course_map,
         pref_thresh,
-        sparse=False,
+        sparse=None,
+        workers=None,
     ):
         course, _, _, section = features
-
-        students = []
-        responses = []
-        statuses = []
-        for _, row in self.df.iterrows():
-            response = [row[crs] if row[crs] > 0 else 1 for crs in all_courses]
-            preferred = top_preferred(
-                course_map, schedule, course, response, pref_thresh
+        global_constraints = self.global_constraints(features, schedule, sparse)
+        responses, statuses, total_courses, valid = self.response_matrix(
+            all_courses, status_max_course_map
+        )
+        num_skipped = len(valid) - valid.sum()
+        if num_skipped > 0:
+            warnings.warn(
+                f"total courses not specified; skipping {num_skipped} students"
             )
-            total_num_courses = row["3"]
-            status = row["1"]
+        preferences = np.where(responses > 0, responses, 1)
+        preferred_idxs = batch_top_preferred(course_map, preferences, pref_thresh)
 
-            if np.isnan(total_num_courses):
-                warnings.warn("total courses not specified; skipping student")
-                continue
+        students = build_students(
+            zip(preferred_idxs, total_courses.tolist()),
+            course,
+            section,
+            global_constraints,
+            schedule,
+            self.registry.values(course, section, schedule),
+            sparse=sparse,
+            legacy=True,
+            workers=workers,
+        )
 
-            total_num_courses = min(total_num_courses, status_max_course_map[status])
-
-            responses.append([row[crs] for crs in all_courses])
-            statuses.append(status)
-            student = SurveyStudent(
-                preferred,
-                total_num_courses,
-                course,
-                section,
-                [
-                    self.course_time_constr(features, schedule, sparse),
-                    self.course_sect_constr(features, schedule, sparse),
-                ],
-                schedule,
-                sparse=sparse,
-            )
-            legacy_student = LegacyStudent(student, student.preferred_courses, course)
-            legacy_student.student.valuation.valuation = (
-                legacy_student.student.valuation.compile()
-            )
-            students.append(legacy_student)
+        return students, np.nan_to_num(responses, nan=1.0), statuses.tolist()
 
-        return students, np.nan_to_num(responses, nan=1.0), statuses
+    def response_matrix(self, all_courses, status_max_course_map):
+        """Extract course ratings, statuses and total courses for all respondents at once
 
+        Rows without a total course count are dropped and the total course count of the
+        remaining rows is clamped to the maximum allowed for their status.
 
-class QSchedule:
+        Args:
+            all_courses (list[str]): Survey columns of the courses to extract
+            status_max_course_map (dict): Maximum number of courses for each status
 
-    def __init__(self, in_file):
-        self.df = pd.read_excel(in_file)
+        Returns:
+            tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]: Raw course ratings, statuses and
+                clamped total courses of the valid rows, along with the mask of valid rows
+        """
+        # ratings streamed as small integers come out as read_csv would parse them
+        ratings = self.df[all_courses]
+        if ratings.isna().to_numpy().any():
+            responses = ratings.to_numpy(dtype=float, na_value=np.nan)
+        elif all(pd.api.types.is_integer_dtype(dtype) for dtype in ratings.dtypes):
+            responses = ratings.to_numpy(dtype=np.int64)
+        else:
+            responses = ratings.to_numpy()
+        statuses = self.df["1"].to_numpy()
+        total_courses = self.df["3"].to_numpy()
+        valid = ~np.isnan(total_courses)
 
-    def capacities(self):
+        responses = responses[valid]
+        statuses = statuses[valid]
+        total_courses = np.minimum(
+            total_courses[valid], map_values(status_max_course_map, statuses)
+        )
+
+        return responses, statuses, total_courses, valid
+
+
+class CapacityIndex:
+    """Enrollment capacities indexed by (catalog, section) for bulk lookups"""
+
+    def __init__(self, catalogs, sections, capacities):
+        """Later entries take precedence over earlier entries for the same (catalog, section)
+
+        Args:
+            catalogs (Iterable): Catalog number of each course section, converted to str
+            sections (Iterable): Section number of each course section, converted to int
+            capacities (Iterable[int]): Enrollment capacity of each course section
+        """
+        index = pd.MultiIndex.from_arrays(
+            [
+                pd.Index(catalogs, dtype=object).map(str),
+                pd.Index(sections).astype(int),
+            ],
+            names=["catalog", "section"],
+        )
+        capacities = pd.Series(np.asarray(capacities), index=index)
+        self.capacities = capacities[
+            ~capacities.index.duplicated(keep="last")
+        ].sort_index()
+        self.catalogs = self.capacities.index.get_level_values("catalog").unique()
+
+    @staticmethod
+    def from_dict(crs_sec_cap_map):
+        entries = [
+            (crs, sec, cap)
+            for crs, sec_cap_map in crs_sec_cap_map.items()
+            for sec, cap in sec_cap_map.items()
+        ]
+        catalogs, sections, capacities = zip(*entries) if entries else ([], [], [])
+
+        return CapacityIndex(catalogs, sections, capacities)
+
+    def has_catalog(self, catalogs):
+        """Mask of the catalogs that have capacity information for at least one section"""
+        return np.asarray(
+            self.catalogs.get_indexer(np.asarray(catalogs, dtype=object)) >= 0
+        )
+
+    def lookup(self, catalogs, sections):
+        """Capacities of a vector of course sections
+
+        Args:
+            catalogs (Iterable): Catalog numbers, compared as str
+            sections (Iterable): Section numbers, compared as int
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: Capacity of each course section (0 where unknown) and
+                the mask of course sections that were found
+        """
+        sections = pd.to_numeric(pd.Series(sections, dtype=object), errors="coerce")
+        valid = sections.notna().to_numpy()
+        keys = pd.MultiIndex.from_arrays(
+            [
+                pd.Index(catalogs, dtype=object).map(str),
+                sections.fillna(-1).astype(int),
+            ]
+        )
+        pos = self.capacities.index.get_indexer(keys)
+        found = valid & (pos >= 0)
+        capacities = np.where(found, self.capacities.to_numpy()[pos], 0)
+
+        return capacities, found
+
+    def to_dict(self):
         crs_sec_cap_map = defaultdict(dict)
-        for _, row in self.df.iterrows():
-            crs_sec_cap_map[str(row["Catalog"])][row["Section"]] = row["Enrl Capacity"]
+        for (crs, sec), cap in zip(
+            self.capacities.index.tolist(), self.capacities.tolist()
+        ):
+            crs_sec_cap_map[crs][sec] = cap
 
         return crs_sec_cap_map
 
+    def __len__(self):
+        return len(self.capacities)
+
+
+class QSchedule:
+
+    def __init__(self, in_file, cache=None):
+        self.in_file = in_file
+        self.cache = cache
+        self._df = None
+
+    @property
+    def df(self):
+        if self._df is None:
+            self._df = pd.read_excel(self.in_file)
+
+        return self._df
+
+    def capacity_index(self):
+        if self.cache is not None:
+            return self.cache.get(
+                "capacity_index", (file_digest(self.in_file),), self._capacity_index
+            )
+
+        return self._capacity_index()
+
+    def _capacity_index(self):
+        return CapacityIndex(
+            self.df["Catalog"], self.df["Section"], self.df["Enrl Capacity"]
+        )
+
+    def capacities(self):
+        """Nested dict view of capacity_index(), mapping catalog to section to capacity"""
+        return self.capacity_index().to_dict()
+
 
 class QMapper:
 
-    def __init__(self, in_file):
-        self.df = pd.read_csv(in_file, sep="|")
+    def __init__(self, in_file, cache=None):
+        self.in_file = in_file
+        self.cache = cache
+        self._df = None
+        self._index = None
+
+    @property
+    def df(self):
+        if self._df is None:
+            self._df = pd.read_csv(self.in_file, sep="|")
+
+        return self._df
+
+    @property
+    def index(self):
+        """Description of each question, keeping the first entry of repeated questions"""
+        if self._index is None:
+            df = self.df.drop_duplicates("question")
+            self._index = dict(zip(df.question, df.description))
+
+        return self._index
 
     def desc_for_ques(self, ques):
-        return self.df[self.df.question == ques].description.values[0]
+        return self.descriptions([ques])[0]
+
+    def descriptions(self, questions):
+        """Look up the descriptions of several questions at once
+
+        Args:
+            questions (list[str]): Survey questions
+
+        Raises:
+            KeyError: If any of the questions is missing from the mapping; all missing
+                questions are listed
+
+        Returns:
+            list[str]: The description of each question
+        """
+        index = self.index
+        missing = [ques for ques in questions if ques not in index]
+        if missing:
+            raise KeyError(f"No description for questions {missing}")
+
+        return [index[ques] for ques in questions]
 
     def mapping(self, questions):
-        # construct course information map
-        course_map = {}
-        for crs in questions:
-            raw_description = self.desc_for_ques(crs)
-            catalog, course_num, section, description = parser.extract_course_info(
-                raw_description
+        if self.cache is not None:
+            questions = list(questions)
+            return self.cache.get(
+                "mapping",
+                (file_digest(self.in_file), questions),
+                lambda: self._mapping(questions),
             )
-            instructor = parser.extract_instructor_info(raw_description)
-            days, start_time, end_time = parser.extract_schedule_info(raw_description)
-            try:
-                course_map[crs] = {
-                    "catalog": catalog,
-                    "course num": course_num,
-                    "section": section,
-                    "description": description,
-                    "instructor": instructor,
-                    "days": days,
-                    "time range": start_time.strftime("%I:%M %p")
-                    + " - "
-                    + end_time.strftime("%I:%M %p"),
-                }
-            except AttributeError:
-                continue
 
-        return course_map
+        return self._mapping(questions)
+
+    def _mapping(self, questions):
+        # construct course information map, skipping courses without a schedule
+        questions = list(questions)
+        course_infos = parser.parse_descriptions(self.descriptions(questions))
+
+        return {
+            crs: info for crs, info in zip(questions, course_infos) if info is not None
+        }
+
+    def features_and_schedule(self, course_map, crs_sec_cap_map, drop_on_warning=True):
+        """Construct features and schedule, reusing cached results when available
+
+        Features and schedule are cached together so that the schedule items keep referring
+        to the same feature objects after loading.
+
+        Args:
+            course_map (dict): Course information for each survey column
+            crs_sec_cap_map (dict): Capacity of each course section
+            drop_on_warning (bool, optional): Drop items without capacity information. Defaults to True.
+
+        Returns:
+            tuple[list[Feature], list[ScheduleItem]]: The features and the schedule
+        """
+
+        def build():
+            features = self.features(course_map)
+            schedule = self.schedule(
+                course_map, crs_sec_cap_map, features, drop_on_warning
+            )
+            return features, schedule
+
+        if self.cache is None:
+            return build()
+
+        return self.cache.get(
+            "schedule",
+            (course_map, crs_sec_cap_map, drop_on_warning),
+            build,
+        )
 
     @staticmethod
     def features(course_map):
@@ -406,25 +1442,35 @@ class QMapper:
     @staticmethod
     def schedule(course_map, crs_sec_cap_map, features, drop_on_warning=True):
         # construct schedule
+        if not isinstance(crs_sec_cap_map, CapacityIndex):
+            crs_sec_cap_map = CapacityIndex.from_dict(crs_sec_cap_map)
+        entries = list(course_map.values())
+        courses = [str(map["course num"]) for map in entries]
+        has_course = crs_sec_cap_map.has_catalog(courses)
+        capacities, found = crs_sec_cap_map.lookup(
+            courses, [map["section"] for map in entries]
+        )
+        capacities = capacities.tolist()
+
         schedule = []
         days = Weekday().days
-        for idx, (crs, map) in enumerate(course_map.items()):
-            crs = str(map["course num"])
+        for idx, map in enumerate(entries):
+            crs = courses[idx]
             slt = slots_for_time_range(map["time range"], features[1].times)
             sec = map["section"]
             capacity = DEFAULT_CAPACITY
-            if crs not in crs_sec_cap_map:
+            if not has_course[idx]:
                 warnings.warn(f"No capacity information for course {crs}")
                 if drop_on_warning:
                     continue
-            elif int(sec) not in crs_sec_cap_map[crs]:
+            elif not found[idx]:
                 warnings.warn(
                     f"No capacity information for course {crs} and section {sec}"
                 )
                 if drop_on_warning:
                     continue
             else:
-                capacity = crs_sec_cap_map[crs][int(sec)]
+                capacity = capacities[idx]
             dys = tuple([day for day in days if day in map["days"]])
             schedule.append(
                 ScheduleItem(
@@ -433,3 +1479,23 @@ class QMapper:
             )
 
         return schedule
+
+
+# imported last since these modules build on the classes above
+# isort: off
+from qsurvey.population import (  # noqa: E402
+    StudentPopulation,
+    StudentView,
+    build_population,
+)
+from qsurvey.incremental import ChangeSet, IncrementalPopulation  # noqa: E402
+from qsurvey.generator import (  # noqa: E402
+    SURVEY_COLUMNS,
+    SurveyModel,
+    generate_realistic_survey,
+    generate_survey,
+    random_survey,
+    write_survey,
+)
+
+# isort: on
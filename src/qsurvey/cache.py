@@ -0,0 +1,207 @@
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+import warnings
+from functools import lru_cache
+from importlib import metadata
+from pathlib import Path
+
+import numpy as np
+
+from qsurvey import parser
+
+CACHE_VERSION = 1
+
+_digests = {}
+
+
+def default_cache_dir():
+    """Directory used when no cache directory is given explicitly
+
+    Returns:
+        Path: $QSURVEY_CACHE_DIR if set, otherwise qsurvey under $XDG_CACHE_HOME or ~/.cache
+    """
+    if "QSURVEY_CACHE_DIR" in os.environ:
+        return Path(os.environ["QSURVEY_CACHE_DIR"])
+    base = os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache")
+
+    return Path(base) / "qsurvey"
+
+
+@lru_cache(maxsize=None)
+def fair_version():
+    """Installed version of fair, including the commit when installed from git
+
+    Returns:
+        str | None: The version, or None if fair is not installed as a distribution
+    """
+    try:
+        distribution = metadata.distribution("fair")
+    except metadata.PackageNotFoundError:
+        return None
+    version = distribution.version
+    direct_url = distribution.read_text("direct_url.json")
+    if direct_url is not None:
+        commit = json.loads(direct_url).get("vcs_info", {}).get("commit_id")
+        if commit is not None:
+            version = f"{version}+{commit}"
+
+    return version
+
+
+def file_digest(path):
+    """Content hash of a file, memoized on its path, size and modification time
+
+    Args:
+        path (str | Path): File to hash
+
+    Returns:
+        str: Hex digest of the file contents
+    """
+    stat = os.stat(path)
+    memo_key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+    if memo_key not in _digests:
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+        _digests[memo_key] = digest.hexdigest()
+
+    return _digests[memo_key]
+
+
+def array_digest(*arrays):
+    """Content hash of NumPy arrays, including their shapes and dtypes
+
+    Args:
+        arrays (np.ndarray): Arrays to hash
+
+    Returns:
+        str: Hex digest of the arrays
+    """
+    digest = hashlib.sha256()
+    for array in arrays:
+        array = np.ascontiguousarray(array)
+        digest.update(f"{array.dtype.str}{array.shape}".encode())
+        digest.update(array.tobytes())
+
+    return digest.hexdigest()
+
+
+class Cache:
+    """On-disk cache of parsed survey inputs keyed by content hash
+
+    Entries are pickled objects whose key combines the entry name, the cache and parser
+    versions, the installed fair version and the supplied key parts (typically file digests
+    and arguments). Changing a source file, bumping parser.PARSER_VERSION or upgrading fair,
+    whose objects are pickled in the entries, therefore invalidates the entry.
+    """
+
+    def __init__(self, directory=None):
+        """
+        Args:
+            directory (str | Path, optional): Where entries are stored. Defaults to None,
+                in which case default_cache_dir() is used.
+        """
+        self.directory = default_cache_dir() if directory is None else Path(directory)
+
+    def key(self, name, parts):
+        digest = hashlib.sha256()
+        digest.update(
+            pickle.dumps(
+                (name, CACHE_VERSION, parser.PARSER_VERSION, fair_version(), parts),
+                protocol=pickle.HIGHEST_PROTOCOL,
+            )
+        )
+
+        return digest.hexdigest()
+
+    def path(self, name, parts):
+        return self.directory / f"{name}-{self.key(name, parts)}.pkl"
+
+    def load(self, name, parts):
+        """Load the entry for (name, parts)
+
+        Args:
+            name (str): Entry name
+            parts (tuple): Picklable values that determine the entry
+
+        Raises:
+            KeyError: If there is no readable entry
+
+        Returns:
+            Any: The cached value
+        """
+        path = self.path(name, parts)
+        if path.exists():
+            try:
+                with open(path, "rb") as f:
+                    return pickle.load(f)
+            except (OSError, EOFError, pickle.UnpicklingError, AttributeError):
+                warnings.warn(f"Ignoring unreadable cache entry {path}")
+
+        raise KeyError(path.name)
+
+    def store(self, name, parts, value):
+        """Store value as the entry for (name, parts), warning if it cannot be written
+
+        The value is written to a temporary file that replaces the entry once complete and is
+        removed if writing fails, so no partial entry is left behind.
+
+        Args:
+            name (str): Entry name
+            parts (tuple): Picklable values that determine the entry
+            value (Any): Picklable value to store
+
+        Raises:
+            Exception: Whatever pickling value raises, e.g. pickle.PicklingError
+        """
+        path = self.path(name, parts)
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        except OSError as e:
+            warnings.warn(f"Unable to write cache entry {path}: {e}")
+            return
+
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+        except BaseException as e:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            if not isinstance(e, OSError):
+                raise
+            warnings.warn(f"Unable to write cache entry {path}: {e}")
+
+    def get(self, name, parts, build):
+        """Load the entry for (name, parts) or build and store it
+
+        Args:
+            name (str): Entry name
+            parts (tuple): Picklable values that determine the entry
+            build (Callable[[], Any]): Constructs the value on a cache miss
+
+        Returns:
+            Any: The cached or freshly built value
+        """
+        try:
+            return self.load(name, parts)
+        except KeyError:
+            pass
+
+        value = build()
+        self.store(name, parts, value)
+
+        return value
+
+    def clear(self):
+        """Remove all entries from the cache directory"""
+        if self.directory.exists():
+            for path in self.directory.glob("*.pkl"):
+                path.unlink()
@@ -0,0 +1,307 @@
+import json
+import math
+import re
+import struct
+import zipfile
+
+import numpy as np
+import pandas as pd
+
+COLUMNAR_VERSION = 1
+COLUMNAR_SUFFIX = ".npz"
+# ratings are stored as uint8 with this value marking a missing rating
+MISSING_RATING = 255
+COURSE_PATTERNS = {
+    "cics": re.compile(r"7 _\d+$"),
+    "compsci": re.compile(r"7_\d+$"),
+    "info": re.compile(r"7 _\d\."),
+}
+# size of the fixed part of a zip local file header, which the name and extra field follow
+_LOCAL_HEADER_SIZE = 30
+
+
+def classify_columns(columns):
+    """Split survey columns into the course rating columns of each course group
+
+    Args:
+        columns (Iterable[str]): Survey column names
+
+    Returns:
+        dict[str, list[str]]: The course columns of the "cics", "compsci" and "info" groups,
+            in column order
+    """
+    return {
+        group: [col for col in columns if pattern.match(col)]
+        for group, pattern in COURSE_PATTERNS.items()
+    }
+
+
+def is_columnar(path):
+    return str(path).endswith(COLUMNAR_SUFFIX)
+
+
+def _encode_ratings(df):
+    values = df.to_numpy(dtype=float, na_value=np.nan).T
+    missing = np.isnan(values)
+    present = values[~missing]
+    if not (np.array_equal(present, np.round(present)) and np.all(present >= 0)):
+        raise ValueError("Course ratings must be non-negative integers")
+    if np.any(present >= MISSING_RATING):
+        raise ValueError(f"Course ratings must not exceed {MISSING_RATING - 1}")
+
+    return np.where(missing, MISSING_RATING, values).astype(np.uint8)
+
+
+def _encode_values(column):
+    if pd.api.types.is_numeric_dtype(column) or pd.api.types.is_bool_dtype(column):
+        return "numeric", {"": column.to_numpy()}
+    # text columns hold few distinct answers, so they are stored as codes into those answers
+    codes, uniques = pd.factorize(column)
+    values = np.array([str(value) for value in uniques], dtype=str)
+
+    return "string", {"": codes.astype(np.int32), "values": values}
+
+
+class ColumnarWriter:
+    """Write a survey, one chunk of rows at a time, to the columnar format
+
+    The file is an uncompressed .npz archive with a metadata array holding the column names,
+    their encodings and the classification of the course columns. The course ratings of each
+    chunk are stored as a single uint8 (courses x rows) array, other numeric columns in their
+    own dtype and text columns as codes into an array of their distinct values.
+    """
+
+    def __init__(self, path):
+        """
+        Args:
+            path (str | Path): Destination .npz file
+        """
+        self.path = path
+        self._zip = zipfile.ZipFile(
+            path, "w", compression=zipfile.ZIP_STORED, allowZip64=True
+        )
+        self.columns = None
+        self.courses = None
+        self.ratings = None
+        self.chunks = []
+        self.encodings = {}
+
+    def _write_array(self, name, array):
+        with self._zip.open(f"{name}.npy", "w", force_zip64=True) as f:
+            np.lib.format.write_array(f, np.asarray(array), allow_pickle=False)
+
+    def write(self, df):
+        """Append the rows of df, which must have the columns of the first chunk"""
+        if self.columns is None:
+            self.columns = [str(col) for col in df.columns]
+            self.courses = classify_columns(self.columns)
+            self.ratings = [col for group in self.courses.values() for col in group]
+            self.encodings = {
+                col: "ratings" if col in self.ratings else None for col in self.columns
+            }
+        elif [str(col) for col in df.columns] != self.columns:
+            raise ValueError("All chunks must have the same columns")
+        df = df.set_axis(self.columns, axis=1)
+
+        chunk = len(self.chunks)
+        self._write_array(f"ratings_{chunk}", _encode_ratings(df[self.ratings]))
+        for j, col in enumerate(self.columns):
+            if self.encodings[col] == "ratings":
+                continue
+            encoding, arrays = _encode_values(df.iloc[:, j])
+            # a column is text as soon as any chunk holds text
+            if encoding == "string" or self.encodings[col] is None:
+                self.encodings[col] = encoding
+            for suffix, array in arrays.items():
+                self._write_array(
+                    f"c{j}_{chunk}{'_' + suffix if suffix else ''}", array
+                )
+        self.chunks.append(len(df))
+
+    def close(self):
+        meta = {
+            "version": COLUMNAR_VERSION,
+            "columns": self.columns or [],
+            "encodings": [self.encodings[col] for col in self.columns or []],
+            "courses": self.courses or classify_columns([]),
+            "chunks": self.chunks,
+        }
+        self._write_array("meta", np.frombuffer(json.dumps(meta).encode(), np.uint8))
+        self._zip.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class ColumnarSurvey:
+    """Read access to a survey in the columnar format
+
+    Arrays are memory-mapped straight from the archive, so only the pages of the requested
+    columns are read from disk.
+    """
+
+    def __init__(self, path):
+        """
+        Args:
+            path (str | Path): A .npz file written by ColumnarWriter
+
+        Raises:
+            ValueError: If the file was written by an incompatible version
+        """
+        self.path = path
+        with zipfile.ZipFile(path) as archive:
+            self._members = {
+                info.filename[: -len(".npy")]: info for info in archive.infolist()
+            }
+        meta = json.loads(self._array("meta").tobytes())
+        if meta["version"] != COLUMNAR_VERSION:
+            raise ValueError(
+                f"Unsupported columnar survey version {meta['version']} in {path}"
+            )
+        self.columns = meta["columns"]
+        self.courses = meta["courses"]
+        self.chunks = meta["chunks"]
+        self._encodings = dict(zip(self.columns, meta["encodings"]))
+        self._positions = {col: j for j, col in enumerate(self.columns)}
+        ratings = [col for group in self.courses.values() for col in group]
+        self._rating_rows = {col: i for i, col in enumerate(ratings)}
+
+    def __len__(self):
+        return sum(self.chunks)
+
+    def _array(self, name):
+        info = self._members[name]
+        if info.compress_type != zipfile.ZIP_STORED:
+            raise ValueError(f"Member {name} of {self.path} is compressed")
+        with open(self.path, "rb") as f:
+            f.seek(info.header_offset)
+            header = f.read(_LOCAL_HEADER_SIZE)
+            name_length, extra_length = struct.unpack("<HH", header[26:30])
+            f.seek(info.header_offset + _LOCAL_HEADER_SIZE + name_length + extra_length)
+            if np.lib.format.read_magic(f) == (1, 0):
+                shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+            else:
+                shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+            offset = f.tell()
+        if math.prod(shape) == 0:
+            return np.empty(shape, dtype=dtype)
+
+        return np.memmap(
+            self.path,
+            dtype=dtype,
+            mode="r",
+            offset=offset,
+            shape=shape,
+            order="F" if fortran_order else "C",
+        )
+
+    def ratings(self, columns):
+        """Raw ratings of the course columns, as a uint8 (columns x rows) array
+
+        Missing ratings are MISSING_RATING.
+        """
+        rows = [self._rating_rows[col] for col in columns]
+        parts = [
+            np.asarray(self._array(f"ratings_{chunk}")[rows])
+            for chunk in range(len(self.chunks))
+        ]
+
+        return np.concatenate(parts, axis=1) if parts else np.zeros((len(rows), 0))
+
+    def column(self, col):
+        """Decode the column col, which must not be a course rating column
+
+        Text columns are parsed as read_csv would, with NaN for missing values.
+
+        Returns:
+            pd.Series: The values of col
+        """
+        j = self._positions[col]
+        chunks = range(len(self.chunks))
+        if self._encodings[col] != "string":
+            values = [np.asarray(self._array(f"c{j}_{chunk}")) for chunk in chunks]
+            return pd.Series(np.concatenate(values) if values else [], name=col)
+
+        answers, codes, offset = [], [], 0
+        for chunk in chunks:
+            values = np.asarray(self._array(f"c{j}_{chunk}"))
+            if f"c{j}_{chunk}_values" in self._members:
+                chunk_answers = self._array(f"c{j}_{chunk}_values").astype(object)
+                chunk_codes = np.where(values < 0, -1, values + offset)
+            else:
+                # a numeric chunk of a text column, e.g. one without any answers
+                chunk_answers = values.astype(object)
+                chunk_codes = np.arange(offset, offset + len(values))
+            answers.append(chunk_answers)
+            codes.append(chunk_codes)
+            offset += len(chunk_answers)
+        # missing values have code -1, which picks the NaN appended to the answers; indexing a
+        # Series of the answers keeps their dtype without converting every row
+        answers = pd.Series(
+            np.concatenate(answers + [np.array([np.nan], dtype=object)])
+        )
+
+        return answers.iloc[np.concatenate(codes)].reset_index(drop=True).rename(col)
+
+    def read(self, columns=None):
+        """Load columns into a DataFrame
+
+        Course ratings are parsed as read_csv would: as int64, or as float64 for columns with
+        missing ratings.
+
+        Args:
+            columns (list[str], optional): Columns to load. Defaults to None, in which case all
+                columns are loaded.
+
+        Returns:
+            pd.DataFrame: The requested columns
+        """
+        columns = self.columns if columns is None else columns
+        ratings = [col for col in columns if col in self._rating_rows]
+        others = [col for col in columns if col not in self._rating_rows]
+        frames = (
+            [pd.concat([self.column(col) for col in others], axis=1)] if others else []
+        )
+
+        # ratings are decoded a block at a time instead of a column at a time
+        values = self.ratings(ratings)
+        missing = values == MISSING_RATING
+        has_missing = missing.any(axis=1)
+        if not has_missing.all():
+            frames.append(
+                pd.DataFrame(
+                    values[~has_missing].T.astype(np.int64),
+                    columns=[col for col, m in zip(ratings, has_missing) if not m],
+                )
+            )
+        if has_missing.any():
+            frames.append(
+                pd.DataFrame(
+                    np.where(missing[has_missing], np.nan, values[has_missing]).T,
+                    columns=[col for col, m in zip(ratings, has_missing) if m],
+                )
+            )
+
+        df = (
+            pd.concat(frames, axis=1)
+            if frames
+            else pd.DataFrame(index=range(len(self)))
+        )
+
+        return df if list(df.columns) == list(columns) else df[columns]
+
+
+def convert_survey(in_file, out_file, chunksize=100_000):
+    """Convert a survey CSV export to the columnar format, reading it in chunks
+
+    Args:
+        in_file (str | Path): Survey CSV export
+        out_file (str | Path): Destination .npz file
+        chunksize (int, optional): Rows read and written at a time. Defaults to 100_000.
+    """
+    with ColumnarWriter(out_file) as writer:
+        for chunk in pd.read_csv(in_file, chunksize=chunksize):
+            writer.write(chunk)
@@ -0,0 +1,131 @@
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import numpy as np
+import pandas as pd
+
+RESULT_COLUMNS = ["algorithm", "metric", "value", "algorithm_time", "metric_time"]
+
+_WORKER_STATE = {}
+
+
+def _init_experiment_worker(state):
+    _WORKER_STATE.update(state)
+
+
+def allocation_matrix(result):
+    """Allocation returned by an algorithm, dropping any bookkeeping returned alongside it
+
+    general_yankee_swap_E returns the allocation as the first element of a tuple, whereas
+    round_robin and serial_dictatorship return it directly.
+    """
+    return result[0] if isinstance(result, tuple) else result
+
+
+def _run_algorithm(name, algorithm, state=None):
+    if state is None:
+        state = _WORKER_STATE
+    start = time.perf_counter()
+    X = allocation_matrix(algorithm(state["students"], state["schedule"]))
+
+    return name, X, time.perf_counter() - start
+
+
+def _run_metric(algorithm_name, name, metric, X, state=None):
+    if state is None:
+        state = _WORKER_STATE
+    start = time.perf_counter()
+    value = metric(X, state["students"], state["schedule"])
+
+    return algorithm_name, name, value, time.perf_counter() - start
+
+
+def _results_frame(algorithms, metrics, algorithm_times, metric_results):
+    rows = []
+    for algorithm_name in algorithms:
+        if len(metrics) == 0:
+            rows.append(
+                (algorithm_name, None, np.nan, algorithm_times[algorithm_name], np.nan)
+            )
+        for metric_name in metrics:
+            value, metric_time = metric_results[(algorithm_name, metric_name)]
+            rows.append(
+                (
+                    algorithm_name,
+                    metric_name,
+                    value,
+                    algorithm_times[algorithm_name],
+                    metric_time,
+                )
+            )
+
+    return pd.DataFrame(rows, columns=RESULT_COLUMNS)
+
+
+def run_experiments(algorithms, metrics, students, schedule, workers=None):
+    """Run allocation algorithms and evaluate metrics on their allocations
+
+    With workers, students and schedule are sent to each worker process once, when it starts,
+    and treated as read-only. All algorithms are dispatched at once and the metrics of an
+    allocation are dispatched as soon as it is available, so the total time approaches that of
+    the slowest algorithm plus its metrics rather than the sum over all algorithms. Algorithms
+    and metrics must then be picklable, e.g. module level functions or functools.partial objects.
+
+    Args:
+        algorithms (dict[str, Callable]): Allocation algorithms by name, called as
+            algorithm(students, schedule)
+        metrics (dict[str, Callable]): Metrics by name, called as metric(X, students, schedule)
+        students (list[BaseAgent]): The students to allocate to
+        schedule (list[ScheduleItem]): All items in the schedule
+        workers (int, optional): Number of worker processes. Defaults to None, in which case
+            everything runs in the calling process.
+
+    Returns:
+        tuple[pd.DataFrame, dict]: A row per (algorithm, metric) pair with the metric value and
+            the wall time in seconds of the algorithm and of the metric, and the allocation of
+            each algorithm
+    """
+    state = {"students": students, "schedule": schedule}
+    allocations, algorithm_times, metric_results = {}, {}, {}
+
+    if workers is None or workers <= 1:
+        for name, algorithm in algorithms.items():
+            _, X, elapsed = _run_algorithm(name, algorithm, state)
+            allocations[name], algorithm_times[name] = X, elapsed
+            for metric_name, metric in metrics.items():
+                _, _, value, metric_time = _run_metric(
+                    name, metric_name, metric, X, state
+                )
+                metric_results[(name, metric_name)] = (value, metric_time)
+
+        return (
+            _results_frame(algorithms, metrics, algorithm_times, metric_results),
+            allocations,
+        )
+
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=_init_experiment_worker, initargs=(state,)
+    ) as pool:
+        algorithm_futures = {
+            pool.submit(_run_algorithm, name, algorithm)
+            for name, algorithm in algorithms.items()
+        }
+        pending = set(algorithm_futures)
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future in algorithm_futures:
+                    name, X, elapsed = future.result()
+                    allocations[name], algorithm_times[name] = X, elapsed
+                    pending |= {
+                        pool.submit(_run_metric, name, metric_name, metric, X)
+                        for metric_name, metric in metrics.items()
+                    }
+                else:
+                    name, metric_name, value, metric_time = future.result()
+                    metric_results[(name, metric_name)] = (value, metric_time)
+
+    return (
+        _results_frame(algorithms, metrics, algorithm_times, metric_results),
+        allocations,
+    )
@@ -0,0 +1,514 @@
+import string
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from itertools import chain, combinations
+
+import numpy as np
+import pandas as pd
+
+from qsurvey import RESPONSE_ID, sample_responses, sample_total_courses
+from qsurvey.columnar import COURSE_PATTERNS, ColumnarWriter, is_columnar
+from qsurvey.kde import MIN_RATING, fit_status_distributions, reseed_distribution
+
+METADATA_COLUMNS = ["Progress", "Duration (in seconds)", "Finished", RESPONSE_ID]
+QUESTION_COLUMNS = ["1", "2", "3", "4"] + [f"5#1_{i}" for i in range(1, 12)]
+CICS_COLUMNS = [f"7 _{i}" for i in range(1, 31)]
+COMPSCI_COLUMNS = [f"7_{i}" for i in range(1, 72)]
+# the info courses repeat the names of the first cics courses, which read_csv suffixes with .1
+INFO_COLUMNS = [f"7 _{i}.1" for i in range(1, 8)]
+COURSE_COLUMNS = CICS_COLUMNS + COMPSCI_COLUMNS + INFO_COLUMNS
+# columns of survey_data.csv as parsed by read_csv
+SURVEY_COLUMNS = METADATA_COLUMNS + QUESTION_COLUMNS + COURSE_COLUMNS
+
+STATUS_RANGE = (1, 6)
+QUESTION_2_RANGE = (0, 7)
+TOTAL_COURSES_RANGE = (1, 7)
+RATING_RANGE = (1, 8)
+DURATION_RANGE = (60, 900)
+RESPONSE_ID_LENGTH = 15
+RESPONSE_ID_CHARS = np.array(list(string.ascii_letters + string.digits))
+# questions other than the status and total courses, resampled jointly from actual respondents
+ANSWER_COLUMNS = ["2", "4"] + QUESTION_COLUMNS[4:]
+
+_WORKER_STATE = {}
+
+
+def powerset(items):
+    """Generate the power set
+
+    Args:
+        items (Iterable): Items from which to generate the power set
+
+    Returns:
+        list[tuple]: All subsets of items, from smallest to largest
+    """
+    s = list(items)
+
+    return list(chain.from_iterable(combinations(s, r) for r in range(len(s) + 1)))
+
+
+def subset_answers(items):
+    """Answers of a multi-select question over items, indexed by subset code
+
+    Args:
+        items (Iterable): Choices of the question
+
+    Returns:
+        np.ndarray: The comma separated choices of each subset of items, with NaN for the empty
+            subset (no answer)
+    """
+    return np.array(
+        [",".join(map(str, subset)) or np.nan for subset in powerset(items)],
+        dtype=object,
+    )
+
+
+# answers of the multi-select questions 4 and 5#1_i, computed once
+QUESTION_4_ANSWERS = subset_answers(range(1, 5))
+QUESTION_5_ANSWERS = subset_answers(range(1, 6))
+
+
+def csv_header(columns):
+    """Header of columns as written by Qualtrics, with the .1 suffix of info courses removed"""
+    return [
+        col.rsplit(".", 1)[0] if COURSE_PATTERNS["info"].match(col) else col
+        for col in columns
+    ]
+
+
+def _rating_fields(ratings):
+    values = ratings.to_numpy(dtype=float, na_value=np.nan)
+    missing = np.isnan(values)
+    present = values[~missing]
+    if not np.array_equal(present, np.round(present)) or np.any(present < 0):
+        return None
+    codes = np.where(missing, -1, values).astype(np.int64)
+
+    # ASCII digits of every value, zero padded, with a last row of zeros for missing ratings
+    # (code -1); cells are followed by a separator and the zero padding is dropped at the end
+    max_value = codes.max(initial=0)
+    width = len(str(max_value))
+    table = np.zeros((max_value + 2, width), dtype=np.uint8)
+    for value in range(max_value + 1):
+        digits = str(value).encode()
+        table[value, : len(digits)] = np.frombuffer(digits, dtype=np.uint8)
+    cells = np.empty(codes.shape + (width + 1,), dtype=np.uint8)
+    cells[..., :width] = table[codes]
+    cells[..., width] = ord(",")
+    cells[:, -1, width] = ord("\n")
+    cells = cells.ravel()
+
+    return cells[cells != 0].tobytes().decode().split("\n")[:-1]
+
+
+def format_csv(df, header=None):
+    """Format the rows of df as CSV, and header if given
+
+    Formatting integer ratings dominates the cost of to_csv, so the trailing course rating
+    columns are formatted through a lookup table of their values instead.
+
+    Args:
+        df (pd.DataFrame): Rows to format
+        header (list[str], optional): Column names to write first. Defaults to None.
+
+    Returns:
+        str: The CSV text
+    """
+    text = partial(
+        df.to_csv,
+        index=False,
+        header=False if header is None else header,
+        lineterminator="\n",
+    )
+    num_courses = next(
+        (
+            i
+            for i, col in enumerate(reversed(df.columns))
+            if not any(pattern.match(col) for pattern in COURSE_PATTERNS.values())
+        ),
+        len(df.columns),
+    )
+    if num_courses == 0 or num_courses == len(df.columns):
+        return text()
+    fields = _rating_fields(df.iloc[:, -num_courses:])
+    lines = (
+        df.iloc[:, :-num_courses]
+        .to_csv(index=False, header=False, lineterminator="\n")
+        .split("\n")[:-1]
+    )
+    # quoted line breaks would split rows apart
+    if fields is None or len(lines) != len(df):
+        return text()
+    rows = "".join(f"{line},{field}\n" for line, field in zip(lines, fields))
+    if header is None:
+        return rows
+
+    return pd.DataFrame(columns=header).to_csv(index=False, lineterminator="\n") + rows
+
+
+def response_ids(num_rows, rng):
+    """Draw num_rows random Qualtrics style response ids"""
+    chars = RESPONSE_ID_CHARS[
+        rng.integers(len(RESPONSE_ID_CHARS), size=(num_rows, RESPONSE_ID_LENGTH))
+    ]
+
+    return np.char.add("R_", chars.view(f"U{RESPONSE_ID_LENGTH}").ravel())
+
+
+def _init_generator_worker(state):
+    _WORKER_STATE.update(state)
+
+
+def _chunk_seed(seed, chunk):
+    return np.random.SeedSequence(seed, spawn_key=(chunk,))
+
+
+def _metadata(num_rows, rng):
+    return {
+        "Progress": np.full(num_rows, 100),
+        "Duration (in seconds)": rng.integers(*DURATION_RANGE, size=num_rows),
+        "Finished": np.ones(num_rows, dtype=int),
+        RESPONSE_ID: response_ids(num_rows, rng),
+    }
+
+
+def _survey_frame(metadata, statuses, total_courses, answers, ratings):
+    """Assemble finished survey responses in the layout SURVEY_COLUMNS"""
+    data = {**metadata, "1": statuses, "3": total_courses, **answers}
+    questions = pd.DataFrame(data)[METADATA_COLUMNS + QUESTION_COLUMNS]
+
+    return pd.concat([questions, ratings], axis=1)
+
+
+def random_survey(num_rows, rng):
+    """Generate num_rows uniformly random survey responses
+
+    Every row is a finished response with a status, a total course count, a subset of choices
+    for each multi-select question and a rating for every course.
+
+    Args:
+        num_rows (int): Number of rows
+        rng (np.random.Generator): Random number generator
+
+    Returns:
+        pd.DataFrame: The responses, with the columns SURVEY_COLUMNS
+    """
+    metadata = _metadata(num_rows, rng)
+    statuses = rng.integers(STATUS_RANGE[0], STATUS_RANGE[1] + 1, size=num_rows)
+    answers = {
+        "2": rng.integers(QUESTION_2_RANGE[0], QUESTION_2_RANGE[1] + 1, size=num_rows)
+    }
+    total_courses = rng.integers(
+        TOTAL_COURSES_RANGE[0], TOTAL_COURSES_RANGE[1] + 1, size=num_rows
+    )
+    answers["4"] = QUESTION_4_ANSWERS[
+        rng.integers(len(QUESTION_4_ANSWERS), size=num_rows)
+    ]
+    multi = QUESTION_5_ANSWERS[
+        rng.integers(
+            len(QUESTION_5_ANSWERS), size=(len(QUESTION_COLUMNS) - 4, num_rows)
+        )
+    ]
+    answers.update(zip(QUESTION_COLUMNS[4:], multi))
+    ratings = rng.integers(
+        RATING_RANGE[0], RATING_RANGE[1] + 1, size=(num_rows, len(COURSE_COLUMNS))
+    )
+
+    return _survey_frame(
+        metadata,
+        statuses,
+        total_courses,
+        answers,
+        pd.DataFrame(ratings, columns=COURSE_COLUMNS),
+    )
+
+
+def generate_survey(num_rows, seed=None, chunksize=100_000):
+    """Generate a uniformly random survey of num_rows rows, chunksize rows at a time
+
+    Each chunk draws from its own stream, derived from seed and the index of the chunk, so the
+    same seed and chunksize always produce the same survey.
+
+    Args:
+        num_rows (int): Number of rows
+        seed (int, optional): Seed of the random streams. Defaults to None.
+        chunksize (int, optional): Rows generated at a time. Defaults to 100_000.
+
+    Yields:
+        pd.DataFrame: Consecutive chunks of the survey
+    """
+    for chunk, start in enumerate(range(0, num_rows, chunksize)):
+        rng = np.random.default_rng(_chunk_seed(seed, chunk))
+        df = random_survey(min(chunksize, num_rows - start), rng)
+        df.index = pd.RangeIndex(start, start + len(df))
+
+        yield df
+
+
+class SurveyModel:
+    """Distributions of the responses of a survey, from which realistic surveys are drawn
+
+    Statuses are drawn with their empirical frequencies. Given the status, course ratings are
+    drawn from the KDE distribution fitted to the actual respondents of that status (courses
+    irrelevant to the status are left unrated), total courses from the empirical total courses
+    of the status, and the answers to the remaining questions from a random respondent of the
+    status.
+    """
+
+    def __init__(
+        self,
+        courses,
+        statuses,
+        frequencies,
+        distributions,
+        relevant_idxs,
+        total_course_lists,
+        max_courses,
+        answers,
+    ):
+        """
+        Args:
+            courses (list[str]): Survey columns of the modeled courses
+            statuses (list[int]): Modeled statuses
+            frequencies (np.ndarray): Empirical frequency of each status
+            distributions (dict[int, Any]): Fitted distribution of the ratings of each status
+            relevant_idxs (dict[int, list[int]]): Courses covered by each distribution
+            total_course_lists (dict[int, np.ndarray]): Total courses of the respondents of each
+                status
+            max_courses (dict[int, int]): Maximum number of courses of each status
+            answers (dict[int, pd.DataFrame]): Answers to ANSWER_COLUMNS of the respondents of
+                each status
+        """
+        self.courses = courses
+        self.statuses = statuses
+        self.frequencies = frequencies
+        self.distributions = distributions
+        self.relevant_idxs = relevant_idxs
+        self.total_course_lists = total_course_lists
+        self.max_courses = max_courses
+        self.answers = answers
+
+    @classmethod
+    def from_survey(
+        cls,
+        qs,
+        course_map,
+        schedule,
+        relevance,
+        status_max_course_map,
+        sample_per_student,
+        num_sub_kernels,
+        seed=None,
+        cache=None,
+        workers=None,
+    ):
+        """Fit a model to the respondents of qs with total courses and a preferred course
+
+        Args:
+            qs (QSurvey): The survey
+            course_map (dict): Course information for each survey column, in schedule order
+            schedule (list[ScheduleItem]): All items in the schedule
+            relevance (StatusRelevance): Courses relevant to each status
+            status_max_course_map (dict): Maximum number of courses for each status
+            sample_per_student (int): Samples drawn per student when fitting
+            num_sub_kernels (int): Number of sub-kernels of each distribution
+            seed (int, optional): Seed of the fitting streams. Defaults to None.
+            cache (Cache, optional): Where fitted distributions are stored. Defaults to None.
+            workers (int, optional): Number of worker processes. Defaults to None.
+
+        Returns:
+            SurveyModel: The fitted model
+        """
+        responses, statuses, total_courses, valid = qs.response_matrix(
+            list(course_map.keys()), status_max_course_map
+        )
+        responses = np.nan_to_num(responses, nan=MIN_RATING)
+        keep = responses.max(axis=1) > MIN_RATING
+        responses = responses[keep]
+        statuses = statuses[keep]
+        total_courses = total_courses[keep]
+        answers = qs.df.loc[valid, ANSWER_COLUMNS][keep]
+        # Qualtrics exports question 2 as integers, which missing answers turn into floats
+        answers = answers.astype({"2": "Int64"})
+
+        distributions = fit_status_distributions(
+            responses,
+            statuses,
+            total_courses,
+            schedule,
+            relevance,
+            sample_per_student,
+            num_sub_kernels,
+            seed=seed,
+            cache=cache,
+            workers=workers,
+        )
+        modeled = list(distributions)
+        counts = np.array([np.sum(statuses == status) for status in modeled])
+
+        return cls(
+            list(course_map.keys()),
+            modeled,
+            counts / counts.sum(),
+            distributions,
+            {status: relevance.indices(status) for status in modeled},
+            {
+                status: total_courses[statuses == status].astype(int)
+                for status in modeled
+            },
+            {status: status_max_course_map[status] for status in modeled},
+            {
+                status: answers[statuses == status].reset_index(drop=True)
+                for status in modeled
+            },
+        )
+
+    def sample(self, num_rows, seed=None, batched=True):
+        """Draw num_rows survey responses
+
+        Args:
+            num_rows (int): Number of rows
+            seed (int | np.random.SeedSequence, optional): Seed of the random streams. Defaults
+                to None.
+            batched (bool, optional): Draw many rows per distribution.sample call (see
+                sample_responses). Defaults to True.
+
+        Returns:
+            pd.DataFrame: The responses, with the columns SURVEY_COLUMNS
+        """
+        seed = (
+            np.random.SeedSequence(seed) if seed is None or np.isscalar(seed) else seed
+        )
+        rng = np.random.default_rng(seed)
+        metadata = _metadata(num_rows, rng)
+        status_idxs = rng.choice(len(self.statuses), size=num_rows, p=self.frequencies)
+        total_courses = np.zeros(num_rows, dtype=int)
+        ratings = np.full((num_rows, len(self.courses)), np.nan)
+        answers = []
+
+        for i, status_seed in enumerate(seed.spawn(len(self.statuses))):
+            status = self.statuses[i]
+            rows = np.flatnonzero(status_idxs == i)
+            if len(rows) == 0:
+                continue
+            distribution = reseed_distribution(self.distributions[status], status_seed)
+            idxs = self.relevant_idxs[status]
+            # irrelevant courses are left unrated, as in the survey
+            ratings[np.ix_(rows, idxs)] = sample_responses(
+                distribution, len(rows), idxs, len(self.courses), batched=batched
+            )[:, idxs]
+            total_courses[rows] = sample_total_courses(
+                self.total_course_lists[status],
+                len(rows),
+                rng,
+                self.max_courses[status],
+            )
+            respondents = rng.integers(len(self.answers[status]), size=len(rows))
+            answers.append(self.answers[status].iloc[respondents].set_axis(rows))
+
+        answers = (
+            pd.concat(answers).sort_index()
+            if answers
+            else pd.DataFrame(columns=ANSWER_COLUMNS)
+        )
+
+        return _survey_frame(
+            metadata,
+            np.array([int(status) for status in self.statuses])[status_idxs],
+            total_courses,
+            {col: answers[col].array for col in ANSWER_COLUMNS},
+            pd.DataFrame(ratings, columns=self.courses).reindex(columns=COURSE_COLUMNS),
+        )
+
+
+def _sample_chunk(num_rows, seed, batched, model=None):
+    if model is None:
+        model = _WORKER_STATE["model"]
+
+    return model.sample(num_rows, seed, batched)
+
+
+def generate_realistic_survey(
+    model, num_rows, seed=None, chunksize=100_000, workers=None, batched=True
+):
+    """Generate a survey of num_rows rows drawn from model, chunksize rows at a time
+
+    Each chunk draws from its own stream, derived from seed and the index of the chunk, so the
+    same seed and chunksize produce the same survey regardless of the number of workers. With
+    workers, chunks are drawn concurrently by processes that receive model once, at most two
+    chunks per worker ahead of the consumer.
+
+    Args:
+        model (SurveyModel): Model of the survey
+        num_rows (int): Number of rows
+        seed (int, optional): Seed of the random streams. Defaults to None.
+        chunksize (int, optional): Rows generated at a time. Defaults to 100_000.
+        workers (int, optional): Number of worker processes. Defaults to None, in which case
+            chunks are drawn in the calling process.
+        batched (bool, optional): Draw many rows per distribution.sample call (see
+            sample_responses). Defaults to True.
+
+    Yields:
+        pd.DataFrame: Consecutive chunks of the survey
+    """
+    if seed is None:
+        # a single entropy draw keeps the chunk streams independent
+        seed = np.random.SeedSequence().entropy
+    starts = range(0, num_rows, chunksize)
+    tasks = [
+        (min(chunksize, num_rows - start), _chunk_seed(seed, chunk), batched)
+        for chunk, start in enumerate(starts)
+    ]
+
+    if workers is None or workers <= 1 or len(tasks) <= 1:
+        chunks = (_sample_chunk(*task, model=model) for task in tasks)
+        for start, df in zip(starts, chunks):
+            df.index = pd.RangeIndex(start, start + len(df))
+            yield df
+        return
+
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_generator_worker,
+        initargs=({"model": model},),
+    ) as pool:
+        pending = deque()
+        tasks = iter(tasks)
+        for start in starts:
+            while len(pending) < 2 * workers:
+                task = next(tasks, None)
+                if task is None:
+                    break
+                pending.append(pool.submit(_sample_chunk, *task))
+            df = pending.popleft().result()
+            df.index = pd.RangeIndex(start, start + len(df))
+            yield df
+
+
+def write_survey(chunks, out_file):
+    """Write chunks of a survey to a CSV export or, for a .npz out_file, the columnar format
+
+    The CSV export has the header Qualtrics writes, in which the info courses repeat the names
+    of the first cics courses.
+
+    Args:
+        chunks (Iterable[pd.DataFrame]): Consecutive chunks of the survey
+        out_file (str | Path): Destination file
+
+    Returns:
+        int: Number of rows written
+    """
+    num_rows = 0
+    if is_columnar(out_file):
+        with ColumnarWriter(out_file) as writer:
+            for df in chunks:
+                writer.write(df)
+                num_rows += len(df)
+    else:
+        with open(out_file, "w", newline="") as f:
+            for i, df in enumerate(chunks):
+                f.write(format_csv(df, None if i else csv_header(df.columns)))
+                num_rows += len(df)
+
+    return num_rows
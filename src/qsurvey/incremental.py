@@ -0,0 +1,255 @@
+import copy
+import warnings
+
+import numpy as np
+
+from qsurvey import (
+    CapacityIndex,
+    ConstraintRegistry,
+    batch_top_preferred,
+    build_students,
+)
+from qsurvey.experiment import allocation_matrix
+
+
+class ChangeSet:
+    """Respondents and schedule items that changed between two snapshots"""
+
+    def __init__(self, added=(), removed=(), modified=(), capacities=()):
+        """
+        Args:
+            added (Iterable): Ids of new respondents
+            removed (Iterable): Ids of respondents that are no longer present
+            modified (Iterable): Ids of respondents whose responses, status or total courses changed
+            capacities (Iterable[int]): Schedule indices of the items whose capacity changed
+        """
+        self.added = set(added)
+        self.removed = set(removed)
+        self.modified = set(modified)
+        self.capacities = set(capacities)
+
+    @property
+    def students(self):
+        """Ids of all respondents that were added, removed or modified"""
+        return self.added | self.removed | self.modified
+
+    def __bool__(self):
+        return bool(self.students or self.capacities)
+
+    def __repr__(self):
+        return (
+            f"ChangeSet(added={len(self.added)}, removed={len(self.removed)}, "
+            f"modified={len(self.modified)}, capacities={len(self.capacities)})"
+        )
+
+
+class IncrementalPopulation:
+    """Survey students kept up to date with changing responses and capacities
+
+    Each call to update diffs the survey and capacities against the previous snapshot: only
+    students of new or modified respondents are constructed, all others are reused along with
+    their memoized valuations, and the items whose capacity changed are replaced by copies in a
+    new schedule, so the schedule of an earlier snapshot keeps its capacities. All students
+    share the global constraints of a registry owned by the population. The schedule itself
+    (its courses and sections) is fixed; a new IncrementalPopulation is needed when it changes.
+    """
+
+    def __init__(
+        self,
+        course_map,
+        features,
+        schedule,
+        status_max_course_map,
+        pref_thresh,
+        sparse=None,
+    ):
+        """
+        Args:
+            course_map (dict): Course information for each survey column, in schedule order
+            features (list[Feature]): Course, slot, weekday and section features
+            schedule (list[ScheduleItem]): All items in the schedule
+            status_max_course_map (dict): Maximum number of courses for each status
+            pref_thresh (int): Number of distinct preferred course numbers per student
+            sparse (bool, optional): Should sparse matrices be used for constraints. Defaults to None,
+                in which case it is chosen per constraint from its density.
+        """
+        self.course_map = course_map
+        self.features = features
+        self.items = schedule
+        self.schedule = list(schedule)
+        self.status_max_course_map = status_max_course_map
+        self.pref_thresh = pref_thresh
+        self.sparse = sparse
+        self.registry = ConstraintRegistry()
+        self.keys = []
+        self._rows = {}
+        self._students = {}
+        self._versions = {}
+        self._version = 0
+        self._allocations = {}
+
+    def _capacity_changes(self, capacities):
+        if capacities is None:
+            return {}
+        if not isinstance(capacities, CapacityIndex):
+            capacities = CapacityIndex.from_dict(capacities)
+        course, _, _, section = self.features
+        new_capacities, found = capacities.lookup(
+            [str(item.value(course)) for item in self.schedule],
+            [item.value(section) for item in self.schedule],
+        )
+
+        changes = {}
+        for i, item in enumerate(self.schedule):
+            if not found[i]:
+                warnings.warn(
+                    f"No capacity information for course {item.value(course)} and section "
+                    f"{item.value(section)}; keeping capacity {item.capacity}"
+                )
+            elif new_capacities[i] != item.capacity:
+                changes[i] = int(new_capacities[i])
+
+        return changes
+
+    def update(self, qs, capacities=None):
+        """Bring the population up to date with qs and capacities
+
+        Args:
+            qs (QSurvey): The current survey, loaded with the same course columns
+            capacities (CapacityIndex | dict, optional): Current capacity of each course section.
+                Defaults to None, in which case capacities are left unchanged.
+
+        Returns:
+            ChangeSet: What changed since the previous update
+        """
+        course, _, _, section = self.features
+        responses, statuses, total_courses, valid = qs.response_matrix(
+            list(self.course_map.keys()), self.status_max_course_map
+        )
+        keys = qs.response_ids[valid].tolist()
+        # response_matrix gives int64 ratings without blanks and float64 otherwise
+        responses = np.asarray(responses, dtype=np.float64)
+        rows = {
+            key: (response.tobytes(), status, total)
+            for key, response, status, total in zip(
+                keys, responses, statuses.tolist(), total_courses.tolist()
+            )
+        }
+
+        added = [key for key in keys if key not in self._rows]
+        modified = [
+            key for key in keys if key in self._rows and self._rows[key] != rows[key]
+        ]
+        removed = [key for key in self._rows if key not in rows]
+        changes = ChangeSet(added, removed, modified)
+
+        changed = changes.added | changes.modified
+        rebuild = [i for i, key in enumerate(keys) if key in changed]
+        preferences = np.where(responses[rebuild] > 0, responses[rebuild], 1)
+        preferred_idxs = batch_top_preferred(
+            self.course_map, preferences, self.pref_thresh
+        )
+        # students are built on the original items, which only differ in capacity from those of
+        # any snapshot
+        students = build_students(
+            zip(preferred_idxs, total_courses[rebuild].tolist()),
+            course,
+            section,
+            self.registry.get(self.features, self.items, self.sparse),
+            self.items,
+            self.registry.values(course, section, self.items),
+            sparse=self.sparse,
+            legacy=True,
+        )
+
+        self._version += 1
+        for i, student in zip(rebuild, students):
+            self._students[keys[i]] = student
+            self._versions[keys[i]] = self._version
+        for key in removed:
+            del self._students[key], self._versions[key]
+        self._rows = rows
+        self.keys = keys
+
+        capacity_changes = self._capacity_changes(capacities)
+        if capacity_changes:
+            self.schedule = list(self.schedule)
+            for i, capacity in capacity_changes.items():
+                self.schedule[i] = copy.copy(self.schedule[i])
+                self.schedule[i].capacity = capacity
+            changes.capacities.update(capacity_changes)
+
+        return changes
+
+    @property
+    def students(self):
+        """Current students with at least one preferred course, in survey order"""
+        return [self._students[key] for key in self._allocatable_keys()]
+
+    def _allocatable_keys(self):
+        return [
+            key
+            for key in self.keys
+            if len(self._students[key].student.preferred_courses) > 0
+        ]
+
+    def _warm_start(self, previous, keys, capacities):
+        X_prev, prev_keys, prev_versions, _ = previous
+        columns = {key: j for j, key in enumerate(prev_keys)}
+        X = np.zeros((len(self.schedule), len(keys)), dtype=np.asarray(X_prev).dtype)
+        for j, key in enumerate(keys):
+            if key in columns and prev_versions[key] == self._versions[key]:
+                X[:, j] = np.asarray(X_prev)[:, columns[key]]
+        # items whose previous assignment no longer fits are released entirely
+        X[X.sum(axis=1) > capacities] = 0
+
+        return X
+
+    def allocate(self, algorithm, warm_start=None):
+        """Allocate to the current students, reusing the previous result of algorithm if possible
+
+        The previous allocation is returned unchanged if no student or capacity changed since
+        algorithm was last run. Otherwise, when algorithm accepts an initial allocation through
+        the keyword argument warm_start, it is passed the previous allocation (items x students)
+        restricted to the unchanged students, with items that exceed their new capacity
+        released. Otherwise algorithm runs from scratch.
+
+        Args:
+            algorithm (Callable): Called as algorithm(students, schedule)
+            warm_start (str, optional): Name of the keyword argument through which algorithm
+                accepts an initial allocation. Defaults to None.
+
+        Returns:
+            tuple[np.ndarray, ChangeSet]: The allocation, with a column per student of students,
+                and what changed since algorithm was last run
+        """
+        keys = self._allocatable_keys()
+        versions = {key: self._versions[key] for key in keys}
+        capacities = np.array([item.capacity for item in self.schedule])
+        previous = self._allocations.get(algorithm)
+
+        if previous is None:
+            changes = ChangeSet(added=keys, capacities=range(len(self.schedule)))
+        else:
+            _, prev_keys, prev_versions, prev_capacities = previous
+            changes = ChangeSet(
+                added=[key for key in keys if key not in prev_versions],
+                removed=[key for key in prev_keys if key not in versions],
+                modified=[
+                    key
+                    for key in keys
+                    if key in prev_versions and prev_versions[key] != versions[key]
+                ],
+                capacities=np.flatnonzero(capacities != prev_capacities),
+            )
+            if not changes:
+                return previous[0], changes
+
+        students = [self._students[key] for key in keys]
+        kwargs = {}
+        if warm_start is not None and previous is not None:
+            kwargs[warm_start] = self._warm_start(previous, keys, capacities)
+        X = allocation_matrix(algorithm(students, self.schedule, **kwargs))
+        self._allocations[algorithm] = (X, keys, versions, capacities)
+
+        return X, changes
@@ -0,0 +1,193 @@
+import copy
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from fair.stats.survey import Corpus, SingleTopicSurvey
+
+from qsurvey.cache import array_digest
+
+MIN_RATING = 1
+MAX_RATING = 8
+
+
+def build_surveys(schedule, responses, total_courses):
+    """Wrap each row of responses in a SingleTopicSurvey over schedule
+
+    Args:
+        schedule (list[ScheduleItem]): Items corresponding to the columns of responses
+        responses (np.ndarray): A (students x items) matrix of ratings
+        total_courses (Iterable[int]): Total courses of each student
+
+    Returns:
+        list[SingleTopicSurvey]: A survey per student
+    """
+    return [
+        SingleTopicSurvey(schedule, response, total, MIN_RATING, MAX_RATING)
+        for response, total in zip(responses, total_courses)
+    ]
+
+
+def fit_distribution(
+    schedule, responses, total_courses, sample_per_student, num_sub_kernels, seed=None
+):
+    """Fit the KDE distribution of the corpus formed by responses
+
+    Args:
+        schedule (list[ScheduleItem]): Items corresponding to the columns of responses
+        responses (np.ndarray): A (students x items) matrix of ratings
+        total_courses (Iterable[int]): Total courses of each student
+        sample_per_student (int): Samples drawn per student when fitting
+        num_sub_kernels (int): Number of sub-kernels of the distribution
+        seed (int | np.random.SeedSequence, optional): Seed of the corpus random number
+            generator. Defaults to None.
+
+    Returns:
+        The fitted distribution
+    """
+    corpus = Corpus(
+        build_surveys(schedule, responses, total_courses), np.random.default_rng(seed)
+    )
+
+    return corpus.kde_distribution(sample_per_student, num_sub_kernels)
+
+
+def _generators(value, found, seen):
+    if id(value) in seen:
+        return
+    seen.add(id(value))
+    if isinstance(value, np.random.Generator):
+        found.append(value)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            _generators(item, found, seen)
+    elif isinstance(value, dict):
+        for item in value.values():
+            _generators(item, found, seen)
+    elif hasattr(value, "__dict__") and not isinstance(value, (type, np.ndarray)):
+        for item in vars(value).values():
+            _generators(item, found, seen)
+
+
+def reseed_distribution(distribution, seed):
+    """Copy distribution, drawing its samples from a new random stream
+
+    A fitted distribution samples from the generator of the corpus it was fitted with, so
+    copies sent to several processes would draw the same samples. The copy has every generator
+    it holds reseeded from seed.
+
+    Args:
+        distribution: A fitted distribution
+        seed (int | np.random.SeedSequence): Seed of the new stream
+
+    Returns:
+        The reseeded copy of distribution
+    """
+    distribution = copy.deepcopy(distribution)
+    found = []
+    _generators(distribution, found, set())
+    if not found:
+        warnings.warn(
+            f"{type(distribution).__name__} holds no random number generator to reseed"
+        )
+    seed = (
+        np.random.SeedSequence(seed)
+        if not isinstance(seed, np.random.SeedSequence)
+        else seed
+    )
+    for generator, child in zip(found, seed.spawn(len(found))):
+        generator.bit_generator.state = type(generator.bit_generator)(child).state
+
+    return distribution
+
+
+def _fit_task(task):
+    return fit_distribution(*task)
+
+
+def fit_status_distributions(
+    responses,
+    statuses,
+    total_courses,
+    schedule,
+    relevance,
+    sample_per_student,
+    num_sub_kernels,
+    seed=None,
+    cache=None,
+    workers=None,
+):
+    """Fit a KDE distribution per status over the courses relevant to that status
+
+    Each status draws from its own random stream, derived from seed and the status, so the
+    fitted distributions do not depend on the number of workers. With a cache, fitted
+    distributions are stored under a hash of the status's responses, total courses, relevant
+    items and the fitting parameters, and reloaded instead of refitted on later runs. Statuses
+    without students are skipped with a warning.
+
+    Args:
+        responses (np.ndarray): A (students x courses) matrix of ratings over schedule
+        statuses (np.ndarray): Status of each student
+        total_courses (np.ndarray): Total courses of each student
+        schedule (list[ScheduleItem]): All items in the schedule
+        relevance (StatusRelevance): Courses relevant to each status
+        sample_per_student (int): Samples drawn per student when fitting
+        num_sub_kernels (int): Number of sub-kernels of each distribution
+        seed (int, optional): Seed from which the stream of each status is derived. Defaults to
+            None, in which case fresh entropy is used (and cached fits are reused regardless).
+        cache (Cache, optional): Where fitted distributions are stored. Defaults to None.
+        workers (int, optional): Number of worker processes. Defaults to None, in which case
+            the distributions are fitted in the calling process.
+
+    Returns:
+        dict[int, Any]: The fitted distribution of each status with students
+    """
+    responses = np.asarray(responses)
+    statuses = np.asarray(statuses)
+    total_courses = np.asarray(total_courses)
+
+    distributions, keys, tasks = {}, {}, {}
+    for status in relevance.statuses:
+        rows = statuses == status
+        if not rows.any():
+            warnings.warn(
+                f"No students with status {status}; skipping its distribution"
+            )
+            continue
+        idxs = relevance.indices(status)
+        status_responses = responses[np.ix_(rows, idxs)]
+        status_totals = total_courses[rows]
+        keys[status] = (
+            array_digest(status_responses, status_totals, idxs),
+            sample_per_student,
+            num_sub_kernels,
+            seed,
+            int(status),
+        )
+        if cache is not None:
+            try:
+                distributions[status] = cache.load("kde", keys[status])
+                continue
+            except KeyError:
+                pass
+        tasks[status] = (
+            [schedule[i] for i in idxs],
+            status_responses,
+            status_totals,
+            sample_per_student,
+            num_sub_kernels,
+            np.random.SeedSequence(seed, spawn_key=(int(status),)),
+        )
+
+    if workers is None or workers <= 1 or len(tasks) <= 1:
+        fitted = dict(zip(tasks.keys(), map(_fit_task, tasks.values())))
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as pool:
+            fitted = dict(zip(tasks.keys(), pool.map(_fit_task, tasks.values())))
+
+    for status, distribution in fitted.items():
+        if cache is not None:
+            cache.store("kde", keys[status], distribution)
+        distributions[status] = distribution
+
+    return {status: distributions[status] for status in keys}
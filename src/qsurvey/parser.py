@@ -1,10 +1,36 @@
-from datetime import datetime
+from datetime import time
 import re
 
+import pandas as pd
 
-def extract_course_info(html):
-    course_match = re.search(r"<strong>Course:.*?</strong>(.*?)\s*&nbsp;", html)
-    parts = course_match.group(1).strip().split(" ")
+# bump whenever the parsed output changes so that cached mappings are invalidated
+PARSER_VERSION = 1
+
+_COURSE = r"<strong>Course:.*?</strong>(?P<course>.*?)\s*&nbsp;"
+_INSTRUCTOR = r"<strong>Instructor:.*?</strong>(?P<instructor>.*?)(?:\s*&nbsp;|$)"
+_SCHEDULE = r"<strong>Schedule:.*?</strong>(?P<schedule>.*?)\s*&nbsp;"
+_TIME = r"\d{2}:\d{2}\s+[AP]M"
+
+COURSE_PATTERN = re.compile(_COURSE)
+INSTRUCTOR_PATTERN = re.compile(_INSTRUCTOR)
+SCHEDULE_PATTERN = re.compile(_SCHEDULE)
+# each field is located by its own lookahead from the start of the description, which is
+# equivalent to searching for it separately but takes a single call
+DESCRIPTION_PATTERN = re.compile(
+    "".join(f"(?:(?=(?s:.*?){field}))?" for field in (_COURSE, _INSTRUCTOR, _SCHEDULE))
+)
+COURSE_PARTS_PATTERN = re.compile(
+    r"^(?P<catalog>[^ ]*) (?P<number>[^ ]*)(?: (?P<description>(?s:.*)))?$"
+)
+COURSE_SECTION_PATTERN = re.compile(r"^(?P<course>[^-]*)-(?P<section>[^-,]*)[^-]*$")
+DAY_TIME_PATTERN = re.compile(
+    rf"(?P<days>[A-Za-z]+)\s+(?P<start>{_TIME})\s+-\s+(?P<end>{_TIME})"
+)
+TIME_PATTERN = re.compile(r"(\d{2}):(\d{2})\s+([AP]M)")
+
+
+def _course_parts(course_str):
+    parts = course_str.strip().split(" ")
     catalog = parts[0]
     try:
         course, section = parts[1].split("-")
@@ -17,26 +43,132 @@ def extract_course_info(html):
     return catalog, course, section, description
 
 
+def _parse_time(time_str):
+    hour, minute, period = TIME_PATTERN.match(time_str).groups()
+    hour, minute = int(hour), int(minute)
+    if not (1 <= hour <= 12 and minute <= 59):
+        raise ValueError(f"time data {time_str!r} does not match format '%I:%M %p'")
+
+    return time(hour % 12 + (12 if period == "PM" else 0), minute)
+
+
+def _format_time(time_str):
+    return _parse_time(time_str).strftime("%I:%M %p")
+
+
+def extract_course_info(html):
+    course_match = COURSE_PATTERN.search(html)
+
+    return _course_parts(course_match.group(1))
+
+
 def extract_instructor_info(html):
-    instructor_match = re.search(
-        r"<strong>Instructor:.*?</strong>(.*?)(?:\s*&nbsp;|$)", html
-    )
+    instructor_match = INSTRUCTOR_PATTERN.search(html)
 
     return instructor_match.group(1).strip() if instructor_match else None
 
 
 def extract_schedule_info(html):
-    schedule_match = re.search(r"<strong>Schedule:.*?</strong>(.*?)\s*&nbsp;", html)
+    schedule_match = SCHEDULE_PATTERN.search(html)
     schedule = schedule_match.group(1).strip() if schedule_match else None
 
     days_str, start_time, end_time = None, None, None
     if schedule:
-        day_time_match = re.match(
-            r"([A-Za-z]+)\s+(\d{2}:\d{2}\s+[AP]M)\s+-\s+(\d{2}:\d{2}\s+[AP]M)", schedule
-        )
+        day_time_match = DAY_TIME_PATTERN.match(schedule)
         if day_time_match:
             days_str, start_time_str, end_time_str = day_time_match.groups()
-            start_time = datetime.strptime(start_time_str, "%I:%M %p").time()
-            end_time = datetime.strptime(end_time_str, "%I:%M %p").time()
+            start_time = _parse_time(start_time_str)
+            end_time = _parse_time(end_time_str)
 
     return days_str, start_time, end_time
+
+
+def parse_description(html):
+    """Extract all course information from a description in a single regex call
+
+    Args:
+        html (str): Raw description from the survey column mapping
+
+    Raises:
+        AttributeError: If the description does not contain course information
+
+    Returns:
+        dict | None: Course information, or None if the description has no valid schedule
+    """
+    fields = DESCRIPTION_PATTERN.match(html).groupdict()
+    catalog, course_num, section, description = _course_parts(fields["course"])
+    instructor = fields["instructor"]
+    instructor = instructor.strip() if instructor is not None else None
+    schedule = fields["schedule"].strip() if fields["schedule"] else None
+    day_time_match = DAY_TIME_PATTERN.match(schedule) if schedule else None
+    if day_time_match is None:
+        return None
+    days, start_time, end_time = day_time_match.groups()
+
+    return {
+        "catalog": catalog,
+        "course num": course_num,
+        "section": section,
+        "description": description,
+        "instructor": instructor,
+        "days": days,
+        "time range": _format_time(start_time) + " - " + _format_time(end_time),
+    }
+
+
+def parse_descriptions(descriptions):
+    """Bulk version of parse_description operating on a whole column of descriptions
+
+    Args:
+        descriptions (pd.Series | list[str]): Raw descriptions from the survey column mapping
+
+    Raises:
+        AttributeError: If any description does not contain course information. Other
+            malformed descriptions raise what parse_description raises for them.
+
+    Returns:
+        list[dict | None]: Course information for each description, None where the
+            description has no valid schedule
+    """
+    descriptions = pd.Series(descriptions, dtype=object).reset_index(drop=True)
+    # fall back to the scalar parser so that malformed entries fail the same way
+    for html in descriptions[~descriptions.map(lambda html: isinstance(html, str))]:
+        parse_description(html)
+    fields = descriptions.str.extract(DESCRIPTION_PATTERN)
+
+    course = fields["course"].str.strip()
+    parts = course.str.extract(COURSE_PARTS_PATTERN)
+    for html in descriptions[parts["number"].isna()]:
+        parse_description(html)
+    number = parts["number"].str.extract(COURSE_SECTION_PATTERN)
+    has_section = number["course"].notna()
+
+    schedule = fields["schedule"].str.strip()
+    day_time = schedule.str.extract(r"^" + DAY_TIME_PATTERN.pattern)
+    valid = day_time["days"].notna()
+    for column in ("start", "end"):
+        for time_str in day_time.loc[valid, column].unique():
+            _parse_time(time_str)
+        # validated times only differ from "%I:%M %p" in the whitespace before AM/PM
+        day_time[column] = day_time[column].str[:5] + " " + day_time[column].str[-2:]
+
+    columns = {
+        "catalog": parts["catalog"],
+        "course num": number["course"].where(has_section, parts["number"]),
+        "section": number["section"].where(has_section, "01"),
+        "description": parts["description"].fillna(""),
+        "instructor": fields["instructor"].str.strip(),
+        "days": day_time["days"],
+        "time range": day_time["start"] + " - " + day_time["end"],
+    }
+    values = zip(
+        *(
+            column.astype(object).where(column.notna(), None).tolist()
+            for column in columns.values()
+        )
+    )
+
+    return [
+        dict(zip(columns.keys(), row)) if ok else None
+        for row, ok in zip(values, valid.tolist())
+    ]
@@ -0,0 +1,526 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from fair.agent import LegacyStudent
+from scipy.sparse import csr_matrix
+
+from qsurvey import (
+    SurveyStudent,
+    batch_top_preferred,
+    course_section_values,
+    fit_status_distributions,
+    iter_synthetic_responses,
+    sample_total_courses,
+)
+from qsurvey.kde import reseed_distribution
+
+
+def _compact_responses(responses):
+    responses = np.asarray(responses)
+    if responses.size > 0 and np.isfinite(responses).all():
+        integral = np.array_equal(responses, np.round(responses))
+        if integral and responses.min() >= 0 and responses.max() <= 255:
+            return responses.astype(np.uint8)
+
+    return responses.astype(np.float32)
+
+
+def _preferred_csr(preferred_idxs, num_items):
+    lengths = np.array([len(idxs) for idxs in preferred_idxs], dtype=np.int64)
+    indptr = np.zeros(len(preferred_idxs) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=indptr[1:])
+    indices = (
+        np.concatenate(preferred_idxs).astype(np.int32)
+        if len(preferred_idxs) > 0
+        else np.zeros(0, dtype=np.int32)
+    )
+
+    return csr_matrix(
+        (np.ones(len(indices), dtype=bool), indices, indptr),
+        shape=(len(preferred_idxs), num_items),
+    )
+
+
+class StudentView:
+    """Lightweight handle on a single student of a StudentPopulation
+
+    The student's SurveyStudent (or LegacyStudent) is only constructed when it is first
+    needed; attributes not defined on the view are delegated to it.
+    """
+
+    __slots__ = ("population", "index", "_student")
+
+    def __init__(self, population, index):
+        self.population = population
+        self.index = index
+        self._student = None
+
+    @property
+    def status(self):
+        return self.population.statuses[self.index]
+
+    @property
+    def total_courses(self):
+        return self.population.total_courses[self.index]
+
+    @property
+    def response(self):
+        return self.population.responses[self.index]
+
+    @property
+    def preferred_idxs(self):
+        return self.population.preferred_idxs(self.index)
+
+    @property
+    def synthetic(self):
+        return bool(self.population.synthetic[self.index])
+
+    @property
+    def materialized(self):
+        return self._student is not None
+
+    def materialize(self):
+        if self._student is None:
+            self._student = self.population.build(self.index)
+
+        return self._student
+
+    def release(self):
+        """Drop the constructed student so that it is rebuilt on next access"""
+        self._student = None
+
+    def __getattr__(self, name):
+        return getattr(self.materialize(), name)
+
+    def __repr__(self):
+        return f"StudentView({self.index}, status={self.status})"
+
+
+class StudentPopulation:
+    """Struct-of-arrays storage of a population of survey students
+
+    Responses, statuses and total courses are stored in compact NumPy arrays and the preferred
+    items of all students in a single CSR matrix. Students are exposed as StudentViews that
+    construct their SurveyStudent on demand.
+    """
+
+    def __init__(
+        self,
+        responses,
+        statuses,
+        total_courses,
+        preferred,
+        course,
+        section,
+        global_constraints,
+        schedule,
+        sparse=None,
+        memoize=True,
+        legacy=True,
+        synthetic=None,
+    ):
+        """
+        Args:
+            responses (np.ndarray): A (students x courses) matrix of ratings
+            statuses (np.ndarray): Status of each student
+            total_courses (np.ndarray): Maximum number of courses of each student
+            preferred (csr_matrix | list[np.ndarray]): Preferred item indices of each student
+            course (Course): Course feature
+            section (Section): Section feature
+            global_constraints (list[LinearConstraint]): Constraints shared by all students
+            schedule (list[ScheduleItem]): All items in the schedule
+            sparse (bool, optional): Should sparse matrices be used for constraints. Defaults to None,
+                in which case it is chosen per constraint from its density.
+            memoize (bool, optional): Should results be cached. Defaults to True.
+            legacy (bool, optional): Materialize students as LegacyStudents with compiled valuations.
+                Defaults to True.
+            synthetic (np.ndarray, optional): Which students are synthetic. Defaults to None, in
+                which case all students are actual.
+        """
+        self.responses = _compact_responses(responses)
+        self.statuses = np.asarray(statuses).astype(np.int8)
+        self.total_courses = np.asarray(total_courses).astype(np.int8)
+        if not isinstance(preferred, csr_matrix):
+            preferred = _preferred_csr(preferred, len(schedule))
+        self.preferred = preferred
+        self.course = course
+        self.section = section
+        self.global_constraints = global_constraints
+        self.schedule = schedule
+        self.schedule_values = course_section_values(schedule, course, section)
+        self.sparse = sparse
+        self.memoize = memoize
+        self.legacy = legacy
+        self.synthetic = (
+            np.zeros(len(self.statuses), dtype=bool)
+            if synthetic is None
+            else np.asarray(synthetic, dtype=bool)
+        )
+        self._views = [None] * len(self.statuses)
+
+    @staticmethod
+    def from_responses(
+        responses,
+        statuses,
+        total_courses,
+        course_map,
+        pref_thresh,
+        features,
+        global_constraints,
+        schedule,
+        **kwargs,
+    ):
+        """Create a population, selecting preferred items of all students in one batch
+
+        Args:
+            responses (np.ndarray): A (students x courses) matrix of ratings
+            statuses (np.ndarray): Status of each student
+            total_courses (np.ndarray): Maximum number of courses of each student
+            course_map (dict): Course information for each survey column
+            pref_thresh (int): Number of distinct preferred course numbers per student
+            features (list[Feature]): Course, slot, weekday and section features
+            global_constraints (list[LinearConstraint]): Constraints shared by all students
+            schedule (list[ScheduleItem]): All items in the schedule
+            kwargs: Passed on to StudentPopulation
+
+        Returns:
+            StudentPopulation: The population
+        """
+        course, _, _, section = features
+        preferences = np.where(responses > 0, responses, 1)
+        preferred = batch_top_preferred(course_map, preferences, pref_thresh)
+
+        return StudentPopulation(
+            np.nan_to_num(responses, nan=1.0),
+            statuses,
+            total_courses,
+            preferred,
+            course,
+            section,
+            global_constraints,
+            schedule,
+            **kwargs,
+        )
+
+    @staticmethod
+    def from_survey(
+        qs,
+        course_map,
+        all_courses,
+        features,
+        schedule,
+        status_max_course_map,
+        pref_thresh,
+        **kwargs,
+    ):
+        """Create the population of actual students, the array counterpart of QSurvey.students
+
+        Args:
+            qs (QSurvey): The survey
+            course_map (dict): Course information for each survey column
+            all_courses (list[str]): Survey columns of the courses, in schedule order
+            features (list[Feature]): Course, slot, weekday and section features
+            schedule (list[ScheduleItem]): All items in the schedule
+            status_max_course_map (dict): Maximum number of courses for each status
+            pref_thresh (int): Number of distinct preferred course numbers per student
+            kwargs: Passed on to StudentPopulation
+
+        Returns:
+            StudentPopulation: The population
+        """
+        responses, statuses, total_courses, _ = qs.response_matrix(
+            all_courses, status_max_course_map
+        )
+
+        return StudentPopulation.from_responses(
+            responses,
+            statuses,
+            total_courses,
+            course_map,
+            pref_thresh,
+            features,
+            qs.global_constraints(features, schedule, kwargs.get("sparse")),
+            schedule,
+            **kwargs,
+        )
+
+    def _like(self, responses, statuses, total_courses, preferred, synthetic):
+        return StudentPopulation(
+            responses,
+            statuses,
+            total_courses,
+            preferred,
+            self.course,
+            self.section,
+            self.global_constraints,
+            self.schedule,
+            self.sparse,
+            self.memoize,
+            self.legacy,
+            synthetic,
+        )
+
+    @staticmethod
+    def concatenate(populations):
+        """Stack populations built over the same schedule into one"""
+        first = populations[0]
+
+        return first._like(
+            np.vstack([pop.responses for pop in populations]),
+            np.concatenate([pop.statuses for pop in populations]),
+            np.concatenate([pop.total_courses for pop in populations]),
+            [pop.preferred_idxs(i) for pop in populations for i in range(len(pop))],
+            np.concatenate([pop.synthetic for pop in populations]),
+        )
+
+    def subset(self, idxs):
+        """Population restricted to the students at idxs (indices or boolean mask)"""
+        idxs = np.arange(len(self))[idxs]
+
+        return self._like(
+            self.responses[idxs],
+            self.statuses[idxs],
+            self.total_courses[idxs],
+            self.preferred[idxs],
+            self.synthetic[idxs],
+        )
+
+    def status_responses(self, status, relevance):
+        """Responses of the students of status, with courses not relevant to it rated 1
+
+        Synthetic students are only drawn over the relevant courses of their status and rate
+        every other course 1, so this puts the actual students of status on the same footing.
+
+        Args:
+            status (int): Status of the students
+            relevance (StatusRelevance): Courses relevant to each status
+
+        Returns:
+            np.ndarray: A (students x courses) matrix of ratings, actual students first
+        """
+        responses = self.responses[self.statuses == status]
+
+        return np.where(relevance.mask(status), responses, 1).astype(responses.dtype)
+
+    def preferred_idxs(self, i):
+        start, stop = self.preferred.indptr[i], self.preferred.indptr[i + 1]
+
+        return self.preferred.indices[start:stop]
+
+    def build(self, i):
+        """Construct the student at index i"""
+        student = SurveyStudent(
+            self.preferred_idxs(i),
+            int(self.total_courses[i]),
+            self.course,
+            self.section,
+            self.global_constraints,
+            self.schedule,
+            self.sparse,
+            self.memoize,
+            self.schedule_values,
+        )
+        if self.legacy:
+            student = LegacyStudent(student, student.preferred_courses, self.course)
+            student.student.valuation.valuation = student.student.valuation.compile()
+
+        return student
+
+    @property
+    def nbytes(self):
+        """Bytes held by the array storage, excluding materialized students"""
+        return (
+            self.responses.nbytes
+            + self.statuses.nbytes
+            + self.total_courses.nbytes
+            + self.preferred.data.nbytes
+            + self.preferred.indices.nbytes
+            + self.preferred.indptr.nbytes
+            + self.synthetic.nbytes
+        )
+
+    def __len__(self):
+        return len(self._views)
+
+    def __getitem__(self, i):
+        i = range(len(self))[i]
+        if self._views[i] is None:
+            self._views[i] = StudentView(self, i)
+
+        return self._views[i]
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+
+def _synthesize_status(task):
+    (
+        distribution,
+        num_samples,
+        relevant_idxs,
+        course_map,
+        total_course_list,
+        max_courses,
+        pref_thresh,
+        seed,
+        batch_size,
+        responses_file,
+        batched,
+    ) = task
+    distribution_seed, total_courses_seed = seed.spawn(2)
+    responses, preferred = [], []
+    # a cached distribution is unpickled with its generator in the same state every time
+    for batch in iter_synthetic_responses(
+        reseed_distribution(distribution, distribution_seed),
+        num_samples,
+        relevant_idxs,
+        len(course_map),
+        batch_size,
+        responses_file,
+        batched,
+    ):
+        # only the current batch is held at full precision
+        responses.append(_compact_responses(batch))
+        preferred.extend(batch_top_preferred(course_map, batch, pref_thresh))
+    total_courses = sample_total_courses(
+        total_course_list,
+        num_samples,
+        np.random.default_rng(total_courses_seed),
+        max_courses,
+    )
+
+    return np.vstack(responses), total_courses, preferred
+
+
+def build_population(
+    qs,
+    schedule,
+    n_synthetic_per_status,
+    course_map,
+    features,
+    relevance,
+    status_max_course_map,
+    pref_thresh,
+    sample_per_student,
+    num_sub_kernels,
+    seed=None,
+    cache=None,
+    workers=None,
+    batch_size=1000,
+    responses_dir=None,
+    batched=True,
+    **kwargs,
+):
+    """Build the population of actual and synthetic students of a survey
+
+    Actual students without total courses or without any preferred course are dropped. A KDE
+    distribution is fitted to the actual students of each status (see fit_status_distributions)
+    and synthetic students are drawn from it, with total courses drawn from those of the actual
+    students of the same status. Ratings are kept on the 1-8 scale throughout. With workers,
+    statuses are fitted and sampled concurrently, each from its own random stream derived from
+    seed. Synthetic responses are drawn from a copy of each distribution reseeded from that
+    stream, so distributions reloaded from cache still give fresh samples when seed is None.
+    Synthetic students are drawn batch by batch (see iter_synthetic_responses) and each batch is
+    compacted before the next is drawn.
+
+    Args:
+        qs (QSurvey): The survey
+        schedule (list[ScheduleItem]): All items in the schedule
+        n_synthetic_per_status (int | dict[int, int]): Synthetic students per status
+        course_map (dict): Course information for each survey column, in schedule order
+        features (list[Feature]): Course, slot, weekday and section features
+        relevance (StatusRelevance): Courses relevant to each status
+        status_max_course_map (dict): Maximum number of courses for each status
+        pref_thresh (int): Number of distinct preferred course numbers per student
+        sample_per_student (int): Samples drawn per student when fitting
+        num_sub_kernels (int): Number of sub-kernels of each distribution
+        seed (int, optional): Seed of the random streams. Defaults to None.
+        cache (Cache, optional): Where fitted distributions are stored. Defaults to None.
+        workers (int, optional): Number of worker processes. Defaults to None.
+        batch_size (int, optional): Synthetic students drawn at a time. Defaults to 1000.
+        responses_dir (str | Path, optional): Directory the synthetic responses of each status
+            are spilled to, as memory-mapped synthetic_{status}.npy files. Defaults to None.
+        batched (bool, optional): Draw many synthetic rows per distribution.sample call (see
+            sample_responses). Defaults to True.
+        kwargs: Passed on to StudentPopulation
+
+    Returns:
+        StudentPopulation: The actual students followed by the synthetic students of each
+            status, the latter marked by population.synthetic
+    """
+    course, _, _, section = features
+    responses, statuses, total_courses, _ = qs.response_matrix(
+        list(course_map.keys()), status_max_course_map
+    )
+    preferences = np.where(responses > 0, responses, 1)
+    preferred = batch_top_preferred(course_map, preferences, pref_thresh)
+    keep = np.array([len(idxs) > 0 for idxs in preferred], dtype=bool)
+    responses = np.nan_to_num(responses[keep], nan=1.0)
+    statuses = statuses[keep]
+    total_courses = total_courses[keep]
+    preferred = [idxs for idxs, kept in zip(preferred, keep) if kept]
+
+    distributions = fit_status_distributions(
+        responses,
+        statuses,
+        total_courses,
+        schedule,
+        relevance,
+        sample_per_student,
+        num_sub_kernels,
+        seed=seed,
+        cache=cache,
+        workers=workers,
+    )
+    tasks = {}
+    for status, distribution in distributions.items():
+        num_samples = (
+            n_synthetic_per_status.get(status, 0)
+            if isinstance(n_synthetic_per_status, dict)
+            else n_synthetic_per_status
+        )
+        if num_samples > 0:
+            tasks[status] = (
+                distribution,
+                num_samples,
+                relevance.indices(status),
+                course_map,
+                total_courses[statuses == status].astype(int),
+                status_max_course_map[status],
+                pref_thresh,
+                # distinct from the stream the distribution of the status was fitted with
+                np.random.SeedSequence(seed, spawn_key=(int(status), 1)),
+                batch_size,
+                (
+                    None
+                    if responses_dir is None
+                    else os.path.join(responses_dir, f"synthetic_{status}.npy")
+                ),
+                batched,
+            )
+
+    if workers is None or workers <= 1 or len(tasks) <= 1:
+        synthesized = list(map(_synthesize_status, tasks.values()))
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as pool:
+            synthesized = list(pool.map(_synthesize_status, tasks.values()))
+
+    sizes = [len(synth_responses) for synth_responses, _, _ in synthesized]
+
+    return StudentPopulation(
+        np.vstack(
+            [_compact_responses(responses)] + [synth[0] for synth in synthesized]
+        ),
+        np.concatenate(
+            [statuses] + [np.full(size, status) for status, size in zip(tasks, sizes)]
+        ),
+        np.concatenate([total_courses] + [synth[1] for synth in synthesized]),
+        preferred + [idxs for synth in synthesized for idxs in synth[2]],
+        course,
+        section,
+        qs.global_constraints(features, schedule, kwargs.get("sparse")),
+        schedule,
+        synthetic=np.repeat([False, True], [len(responses), sum(sizes)]),
+        **kwargs,
+    )
@@ -0,0 +1,172 @@
+import itertools
+import json
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+_WORKER_STATE = {}
+
+
+def _init_sweep_worker(state):
+    _WORKER_STATE.update(state)
+
+
+def expand_grid(grid):
+    """Expand a parameter grid into the list of its cells
+
+    Args:
+        grid (dict[str, Iterable]): Values of each parameter
+
+    Returns:
+        list[dict]: A parameter assignment for every combination of values, varying the
+            last parameter fastest
+    """
+    names = list(grid.keys())
+
+    return [dict(zip(names, values)) for values in itertools.product(*grid.values())]
+
+
+def cell_key(params):
+    """Canonical string identifying the cell with parameters params"""
+    return json.dumps(params, sort_keys=True, default=str)
+
+
+def _as_frame(results):
+    if isinstance(results, pd.DataFrame):
+        return results
+    if isinstance(results, dict):
+        results = [results]
+
+    return pd.DataFrame(results)
+
+
+def _storable(value):
+    if value is None or isinstance(value, (str, int, float, bool, np.generic)):
+        return value
+
+    return str(value)
+
+
+class ResultStore:
+    """Append-only SQLite store of the results of finished sweep cells
+
+    A cell's results and its entry in the cells table are written in a single transaction, so
+    a sweep interrupted at any point leaves only complete cells behind.
+    """
+
+    def __init__(self, path, table="results"):
+        """
+        Args:
+            path (str | Path): SQLite database file, created if it does not exist
+            table (str, optional): Table holding the results. Defaults to "results".
+        """
+        self.path = path
+        self.table = table
+        self.connection = sqlite3.connect(path)
+        with self.connection:
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS cells (key TEXT PRIMARY KEY, seconds REAL)"
+            )
+
+    def finished(self):
+        """Keys of the cells whose results are stored"""
+        return {key for (key,) in self.connection.execute("SELECT key FROM cells")}
+
+    def append(self, params, results, seconds):
+        """Store the results of a finished cell
+
+        Args:
+            params (dict): Parameters of the cell
+            results (pd.DataFrame): Results of the cell, one column is added per parameter
+            seconds (float): Wall time of the cell
+        """
+        key = cell_key(params)
+        results = results.copy()
+        for column in results.columns[results.dtypes == object]:
+            results[column] = results[column].map(_storable)
+        for name, value in params.items():
+            results[name] = _storable(value)
+        results["cell"] = key
+        with self.connection:
+            results.to_sql(self.table, self.connection, if_exists="append", index=False)
+            self.connection.execute("INSERT INTO cells VALUES (?, ?)", (key, seconds))
+
+    def load(self):
+        """All stored results
+
+        Returns:
+            pd.DataFrame: The results of every finished cell, empty if there are none
+        """
+        tables = {
+            name
+            for (name,) in self.connection.execute(
+                "SELECT name FROM sqlite_master WHERE type='table'"
+            )
+        }
+        if self.table not in tables:
+            return pd.DataFrame()
+
+        return pd.read_sql(f'SELECT * FROM "{self.table}"', self.connection)
+
+    def close(self):
+        self.connection.close()
+
+
+def _run_cell(cell, params, state=None):
+    if state is None:
+        state = _WORKER_STATE
+    start = time.perf_counter()
+    results = _as_frame(cell(state["context"], **params))
+
+    return params, results, time.perf_counter() - start
+
+
+def run_sweep(cell, grid, store, context=None, workers=None):
+    """Run cell for every combination of parameters in grid, skipping finished cells
+
+    context holds the inputs shared by every cell, such as the course map, features and
+    schedule, and is built once by the caller. With workers, it is sent to each worker process
+    once, when it starts. Results are written to store by the calling process as soon as a cell
+    finishes, so rerunning an interrupted sweep with the same store only runs the missing cells.
+    If cells fail, the remaining cells still run and the first error is raised at the end.
+
+    Args:
+        cell (Callable): Called as cell(context, **params) and returning a pd.DataFrame, a dict
+            or a list of dicts. Must be picklable when workers are used.
+        grid (dict[str, Iterable]): Values of each parameter, e.g. {"seed": range(100), ...}
+        store (ResultStore): Where results are appended
+        context (Any, optional): Inputs shared by every cell. Defaults to None.
+        workers (int, optional): Number of worker processes. Defaults to None, in which case the
+            cells run in the calling process.
+
+    Returns:
+        pd.DataFrame: All results in store, including those of previous runs
+    """
+    finished = store.finished()
+    cells = [params for params in expand_grid(grid) if cell_key(params) not in finished]
+    state = {"context": context}
+
+    if workers is None or workers <= 1:
+        for params in cells:
+            store.append(*_run_cell(cell, params, state))
+
+        return store.load()
+
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=_init_sweep_worker, initargs=(state,)
+    ) as pool:
+        futures = [pool.submit(_run_cell, cell, params) for params in cells]
+        error = None
+        for future in as_completed(futures):
+            # keep storing the cells that do finish so that a rerun only repeats failures
+            if future.exception() is not None:
+                error = error or future.exception()
+                continue
+            store.append(*future.result())
+    if error is not None:
+        raise error
+
+    return store.load()
@@ -0,0 +1,57 @@
+import pytest
+from pipeline import (
+    MAPPING_FILE,
+    RANDOM_SURVEY_FILE,
+    SCHEDULE_FILE,
+    STATUS_MAX_COURSE_MAP,
+    SURVEY_FILE,
+)
+
+import qsurvey
+
+SURVEY_FILES = {
+    "random_survey": RANDOM_SURVEY_FILE,
+    "survey_data": SURVEY_FILE,
+}
+
+
+@pytest.fixture(scope="session")
+def status_max_course_map():
+    return STATUS_MAX_COURSE_MAP
+
+
+@pytest.fixture(scope="session")
+def survey_files():
+    return SURVEY_FILES
+
+
+@pytest.fixture(scope="session")
+def mapper():
+    return qsurvey.QMapper(MAPPING_FILE)
+
+
+@pytest.fixture(scope="session")
+def crs_sec_cap_map():
+    return qsurvey.QSchedule(SCHEDULE_FILE).capacities()
+
+
+@pytest.fixture(scope="session", params=list(SURVEY_FILES))
+def survey(request, mapper, crs_sec_cap_map):
+    return qsurvey.QSurvey(
+        SURVEY_FILES[request.param], mapper, list(crs_sec_cap_map.keys())
+    )
+
+
+@pytest.fixture(scope="session")
+def course_map(survey, mapper):
+    return mapper.mapping(survey.all_courses)
+
+
+@pytest.fixture(scope="session")
+def features(course_map):
+    return qsurvey.QMapper.features(course_map)
+
+
+@pytest.fixture(scope="session")
+def schedule(course_map, crs_sec_cap_map, features):
+    return qsurvey.QMapper.schedule(course_map, crs_sec_cap_map, features)
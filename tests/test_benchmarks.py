@@ -0,0 +1,210 @@
+"""Time each stage of the pipeline with pytest-benchmark
+
+These are deselected by default. Run them with ``pytest -m benchmark``, save a run with
+``--benchmark-autosave`` and compare later runs with it with ``--benchmark-compare``.
+"""
+
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+import pytest
+from fair.allocation import general_yankee_swap_E
+from pipeline import (
+    MAPPING_FILE,
+    RANDOM_SURVEY_FILE,
+    SCHEDULE_FILE,
+    STATUS_MAX_COURSE_MAP,
+    SURVEY_FILE,
+    Pipeline,
+)
+
+import qsurvey
+from qsurvey.experiment import allocation_matrix
+from qsurvey.kde import build_surveys, fit_distribution
+
+pytest.importorskip("pytest_benchmark")
+pytestmark = pytest.mark.benchmark
+
+GENERATED_ROWS = [10_000, 100_000]
+ROUNDS = 3
+NUM_SYNTHETIC = 100
+FIT_STUDENTS = 500  # students the synthesize_students distribution is fitted on
+ALLOCATION_STUDENTS = 200  # students allocated by general_yankee_swap_E
+NUM_SUB_KERNELS = 3
+SAMPLE_PER_STUDENT = 10
+SEED = 0
+PREF_THRESH = 5
+
+SURVEYS = ["random_survey", "survey_data"] + [
+    f"generated_{num_rows}" for num_rows in GENERATED_ROWS
+]
+
+
+def measure(benchmark, fn, *args, **kwargs):
+    """Benchmark fn and record the peak memory of a traced call in the extra info
+
+    Peak memory is what tracemalloc sees allocated while fn runs: Python objects and NumPy
+    arrays, but not buffers allocated outside the Python allocators (e.g. by pyarrow).
+
+    Returns:
+        Any: The result of the last benchmarked call
+    """
+    result = benchmark.pedantic(fn, args, kwargs, rounds=ROUNDS, iterations=1)
+
+    tracemalloc.start()
+    try:
+        fn(*args, **kwargs)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    benchmark.extra_info["peak_memory"] = peak
+
+    return result
+
+
+@pytest.fixture(scope="session")
+def survey_file(request, tmp_path_factory):
+    name = request.param
+    if name == "random_survey":
+        return RANDOM_SURVEY_FILE
+    if name == "survey_data":
+        return SURVEY_FILE
+
+    num_rows = int(name.removeprefix("generated_"))
+    path = tmp_path_factory.mktemp("surveys") / f"{name}.csv"
+    qsurvey.write_survey(qsurvey.generate_survey(num_rows, SEED), path)
+
+    return path
+
+
+@pytest.fixture(scope="session")
+def pipeline(survey_file):
+    return Pipeline(survey_file)
+
+
+def pytest_generate_tests(metafunc):
+    if "survey_file" in metafunc.fixturenames:
+        metafunc.parametrize("survey_file", SURVEYS, indirect=True, scope="session")
+
+
+def test_mapper(benchmark):
+    def load():
+        mp = qsurvey.QMapper(MAPPING_FILE)
+        mp.index
+
+        return mp
+
+    measure(benchmark, load)
+
+
+def test_capacities(benchmark):
+    measure(benchmark, lambda: qsurvey.QSchedule(SCHEDULE_FILE).capacities())
+
+
+def test_survey(benchmark, survey_file, pipeline):
+    def load():
+        qs = qsurvey.QSurvey(
+            survey_file, pipeline.mp, list(pipeline.crs_sec_cap_map.keys())
+        )
+        qs.df
+
+        return qs
+
+    measure(benchmark, load)
+
+
+def test_mapping(benchmark, pipeline):
+    measure(benchmark, pipeline.mp.mapping, pipeline.qs.all_courses)
+
+
+def test_features(benchmark, pipeline):
+    measure(benchmark, pipeline.mp.features, pipeline.course_map)
+
+
+def test_schedule(benchmark, pipeline):
+    measure(
+        benchmark,
+        pipeline.mp.schedule,
+        pipeline.course_map,
+        pipeline.crs_sec_cap_map,
+        pipeline.features,
+    )
+
+
+def test_students(benchmark, pipeline):
+    measure(
+        benchmark,
+        pipeline.qs.students,
+        pipeline.course_map,
+        pipeline.all_courses,
+        pipeline.features,
+        pipeline.schedule,
+        STATUS_MAX_COURSE_MAP,
+        PREF_THRESH,
+    )
+
+
+def test_synthesize_students(benchmark, pipeline):
+    schedule = pipeline.schedule
+    course, _, _, section = pipeline.features
+
+    # fit the distribution of the most common status outside of the benchmark
+    responses, statuses, total_courses, _ = pipeline.qs.response_matrix(
+        pipeline.all_courses, STATUS_MAX_COURSE_MAP
+    )
+    responses = np.nan_to_num(responses, nan=1.0)
+    status = pd.Series(statuses).mode()[0]
+    idxs = pipeline.relevance.indices(status)
+    rows = np.flatnonzero(statuses == status)[:FIT_STUDENTS]
+    status_responses = responses[np.ix_(rows, idxs)]
+    status_totals = total_courses[rows].astype(int)
+    status_schedule = [schedule[i] for i in idxs]
+    distribution = fit_distribution(
+        status_schedule,
+        status_responses,
+        status_totals,
+        SAMPLE_PER_STUDENT,
+        NUM_SUB_KERNELS,
+        SEED,
+    )
+    surveys = build_surveys(status_schedule, status_responses, status_totals)
+
+    measure(
+        benchmark,
+        lambda: qsurvey.synthesize_students(
+            NUM_SYNTHETIC,
+            course,
+            section,
+            pipeline.features,
+            schedule,
+            pipeline.qs,
+            surveys,
+            distribution,
+            pipeline.course_map,
+            STATUS_MAX_COURSE_MAP[status],
+            idxs,
+            np.random.default_rng(SEED),
+            PREF_THRESH,
+            status_totals.tolist(),
+        ),
+    )
+
+
+def test_general_yankee_swap_E(benchmark, pipeline):
+    students, _, _ = pipeline.qs.students(
+        pipeline.course_map,
+        pipeline.all_courses,
+        pipeline.features,
+        pipeline.schedule,
+        STATUS_MAX_COURSE_MAP,
+        PREF_THRESH,
+    )
+    students = [
+        student for student in students if len(student.student.preferred_courses) > 0
+    ][:ALLOCATION_STUDENTS]
+
+    measure(
+        benchmark,
+        lambda: allocation_matrix(general_yankee_swap_E(students, pipeline.schedule)),
+    )
@@ -0,0 +1,23 @@
+import pytest
+
+
+@pytest.mark.parametrize("workers", [None, 2])
+def test_students_share_the_callers_objects(
+    survey, course_map, features, schedule, status_max_course_map, workers
+):
+    students, _, _ = survey.students(
+        course_map,
+        list(course_map.keys()),
+        features,
+        schedule,
+        status_max_course_map,
+        5,
+        workers=workers,
+    )
+    global_constraints = survey.global_constraints(features, schedule)
+    schedule_ids = {id(item) for item in schedule}
+
+    assert len(students) > 0
+    for student in students:
+        assert student.student.global_constraints is global_constraints
+        assert all(id(item) in schedule_ids for item in student.preferred_courses)
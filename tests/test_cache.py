@@ -0,0 +1,28 @@
+import pickle
+
+import pytest
+
+from qsurvey import cache
+
+
+def test_entries_are_invalidated_by_another_fair_version(tmp_path, monkeypatch):
+    store = cache.Cache(tmp_path)
+    monkeypatch.setattr(cache, "fair_version", lambda: "1.0.0")
+    store.store("schedule", ("digest",), [1, 2, 3])
+    assert store.load("schedule", ("digest",)) == [1, 2, 3]
+
+    monkeypatch.setattr(cache, "fair_version", lambda: "1.1.0")
+
+    with pytest.raises(KeyError):
+        store.load("schedule", ("digest",))
+
+
+def test_failed_store_leaves_no_stray_files(tmp_path):
+    store = cache.Cache(tmp_path)
+
+    with pytest.raises((pickle.PicklingError, TypeError, AttributeError)):
+        store.store("schedule", ("digest",), lambda: None)
+
+    assert list(tmp_path.iterdir()) == []
+    with pytest.raises(KeyError):
+        store.load("schedule", ("digest",))
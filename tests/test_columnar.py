@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import qsurvey
+
+
+def load(survey_file, mapper, crs_sec_cap_map):
+    return qsurvey.QSurvey(survey_file, mapper, list(crs_sec_cap_map.keys()))
+
+
+@pytest.mark.filterwarnings("ignore:total courses not specified")
+@pytest.mark.parametrize("chunksize", [100_000, 100])
+def test_columnar_survey_matches_csv(
+    tmp_path, chunksize, survey_files, mapper, crs_sec_cap_map, status_max_course_map
+):
+    survey_file = survey_files["survey_data"]
+    columnar_file = tmp_path / "survey_data.npz"
+    qsurvey.convert_survey(survey_file, columnar_file, chunksize)
+    csv = load(survey_file, mapper, crs_sec_cap_map)
+    columnar = load(columnar_file, mapper, crs_sec_cap_map)
+    course_map = mapper.mapping(csv.all_courses)
+    all_courses = list(course_map.keys())
+    features, schedule = mapper.features_and_schedule(course_map, crs_sec_cap_map)
+
+    assert columnar.all_courses == csv.all_courses
+    for expected, actual in zip(
+        csv.response_matrix(all_courses, status_max_course_map),
+        columnar.response_matrix(all_courses, status_max_course_map),
+    ):
+        np.testing.assert_array_equal(actual, expected)
+    np.testing.assert_array_equal(columnar.response_ids, csv.response_ids)
+
+    expected, _, _ = csv.students(
+        course_map, all_courses, features, schedule, status_max_course_map, 5
+    )
+    actual, _, _ = columnar.students(
+        course_map, all_courses, features, schedule, status_max_course_map, 5
+    )
+    assert len(actual) == len(expected)
+    for student, expected_student in zip(actual, expected):
+        assert (
+            student.student.preferred_courses
+            == expected_student.student.preferred_courses
+        )
+        assert student.student.total_courses == expected_student.student.total_courses
+
+
+@pytest.mark.parametrize("rating", [3.5, -1, 255, 1000])
+def test_ratings_outside_uint8_are_rejected(tmp_path, survey_files, rating):
+    df = pd.read_csv(survey_files["survey_data"])
+    course = qsurvey.classify_columns(df.columns)["compsci"][0]
+    df[course] = df[course].astype(float)
+    df.loc[2, course] = rating
+    survey_file = tmp_path / "survey.csv"
+    df.to_csv(survey_file, index=False)
+
+    with pytest.raises(ValueError, match="Course ratings"):
+        qsurvey.convert_survey(survey_file, tmp_path / "survey.npz")
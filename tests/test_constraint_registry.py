@@ -0,0 +1,19 @@
+import qsurvey
+
+
+def test_cached_constraints_skip_the_sparsity_scan(features, schedule, monkeypatch):
+    registry = qsurvey.ConstraintRegistry()
+    constraints = registry.get(features, schedule)
+
+    calls = []
+    sparsity = qsurvey.global_constraint_sparsity
+    monkeypatch.setattr(
+        qsurvey,
+        "global_constraint_sparsity",
+        lambda *args: calls.append(args) or sparsity(*args),
+    )
+
+    assert registry.get(features, schedule) is constraints
+    assert calls == []
+    assert registry.get(features, schedule, True) is not constraints
+    assert len(calls) == 1
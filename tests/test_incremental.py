@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+
+import qsurvey
+
+
+def test_blank_rating_of_a_new_respondent_leaves_others_unmodified(
+    tmp_path, survey_files, mapper, crs_sec_cap_map, status_max_course_map
+):
+    survey_file = survey_files["random_survey"]
+    qs = qsurvey.QSurvey(survey_file, mapper, list(crs_sec_cap_map.keys()))
+    course_map = mapper.mapping(qs.all_courses)
+    features, schedule = mapper.features_and_schedule(course_map, crs_sec_cap_map)
+    population = qsurvey.IncrementalPopulation(
+        course_map, features, schedule, status_max_course_map, 5
+    )
+    population.update(qs)
+
+    # a new respondent with one blank rating turns the ratings of everyone into floats
+    df = pd.read_csv(survey_file)
+    respondent = df.iloc[[0]].copy()
+    respondent[qs.all_courses[0]] = np.nan
+    new_survey_file = tmp_path / "survey.csv"
+    pd.concat([df, respondent], ignore_index=True).to_csv(new_survey_file, index=False)
+    new_qs = qsurvey.QSurvey(new_survey_file, mapper, list(crs_sec_cap_map.keys()))
+
+    changes = population.update(new_qs)
+
+    assert changes.added == {len(df)}
+    assert changes.modified == set() and changes.removed == set()
+
+
+def test_update_leaves_earlier_snapshots_unchanged(
+    tmp_path, survey_files, mapper, crs_sec_cap_map, status_max_course_map
+):
+    survey_file = survey_files["random_survey"]
+    qs = qsurvey.QSurvey(survey_file, mapper, list(crs_sec_cap_map.keys()))
+    course_map = mapper.mapping(qs.all_courses)
+    features, schedule = mapper.features_and_schedule(course_map, crs_sec_cap_map)
+    capacities = [item.capacity for item in schedule]
+    population = qsurvey.IncrementalPopulation(
+        course_map, features, schedule, status_max_course_map, 5
+    )
+    population.update(qs, crs_sec_cap_map)
+    snapshot = population.schedule
+
+    df = pd.read_csv(survey_file)
+    new_survey_file = tmp_path / "survey.csv"
+    pd.concat([df, df.iloc[[0]]], ignore_index=True).to_csv(
+        new_survey_file, index=False
+    )
+    new_qs = qsurvey.QSurvey(new_survey_file, mapper, list(crs_sec_cap_map.keys()))
+    catalog = next(iter(crs_sec_cap_map))
+    new_crs_sec_cap_map = {crs: dict(secs) for crs, secs in crs_sec_cap_map.items()}
+    for sec in new_crs_sec_cap_map[catalog]:
+        new_crs_sec_cap_map[catalog][sec] += 5
+
+    changes = population.update(new_qs, new_crs_sec_cap_map)
+
+    assert changes.added == {len(df)} and changes.capacities
+    assert [item.capacity for item in snapshot] == capacities
+    assert [item.capacity for item in schedule] == capacities
+    for i in changes.capacities:
+        assert population.schedule[i].capacity == capacities[i] + 5
+    constraints = {
+        id(student.student.global_constraints) for student in population.students
+    }
+    assert len(constraints) == 1
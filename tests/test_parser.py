@@ -0,0 +1,64 @@
+import math
+
+import pytest
+
+from qsurvey import parser
+
+# descriptions without course information, with a malformed course, schedule or time and
+# with a list of sections
+EDGE_CASES = [
+    math.nan,
+    "",
+    "<strong>Instructor:</strong> A. Person",
+    "<strong>Course:</strong> COMPSCI 101 Intro&nbsp;",
+    "<strong>Course:</strong> COMPSCI 101-02,03 Intro&nbsp;"
+    "<strong>Instructor:</strong> A. Person&nbsp;"
+    "<strong>Schedule:</strong> TuTh 01:00 PM - 02:15 PM&nbsp;",
+    "<strong>Course:</strong> COMPSCI 101 Intro&nbsp;"
+    "<strong>Schedule:</strong> TBA&nbsp;",
+    "<strong>Course:</strong> COMPSCI&nbsp;"
+    "<strong>Schedule:</strong> MoWe 10:00 AM - 11:15 AM&nbsp;",
+    "<strong>Course:</strong> COMPSCI 101 Intro&nbsp;"
+    "<strong>Schedule:</strong> MoWe 13:00 PM - 11:15 AM&nbsp;",
+]
+
+
+def parse(parse_fn, description):
+    try:
+        return parse_fn(description)
+    except Exception as error:
+        return type(error), str(error)
+
+
+def parsable(mapper):
+    return [
+        html
+        for html in mapper.index.values()
+        if not isinstance(parse(parser.parse_description, html), tuple)
+    ]
+
+
+def test_bulk_parser_matches_scalar_parser(mapper):
+    for description in list(mapper.index.values()) + EDGE_CASES:
+        expected = parse(parser.parse_description, description)
+        actual = parse(lambda html: parser.parse_descriptions([html])[0], description)
+
+        assert actual == expected, description
+
+
+def test_bulk_parser_parses_a_column_at_once(mapper):
+    descriptions = parsable(mapper)
+    expected = [parser.parse_description(html) for html in descriptions]
+
+    assert any(info is None for info in expected)
+    assert any(info is not None for info in expected)
+    assert parser.parse_descriptions(descriptions) == expected
+
+
+@pytest.mark.parametrize("description", [math.nan, EDGE_CASES[2], EDGE_CASES[6]])
+def test_malformed_description_fails_the_whole_column(mapper, description):
+    descriptions = parsable(mapper) + [description]
+
+    assert parse(parser.parse_descriptions, descriptions) == parse(
+        parser.parse_description, description
+    )
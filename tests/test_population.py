@@ -0,0 +1,108 @@
+import numpy as np
+from pipeline import STATUS_CRS_PREFIX_MAP
+
+import qsurvey
+from qsurvey import population
+
+
+class Sampler:
+    """Draws rows of normalized ratings from its own generator, like a fitted distribution"""
+
+    def __init__(self, num_items, seed):
+        self.num_items = num_items
+        self.rng = np.random.default_rng(seed)
+
+    def sample(self, size=None):
+        return self.rng.random(
+            self.num_items if size is None else (size, self.num_items)
+        )
+
+
+def synthesize(distribution, seed, batch_size=1000, responses_file=None):
+    course_map = {f"7_{i}": {"course num": str(100 + i)} for i in range(4)}
+    task = (
+        distribution,
+        20,
+        [0, 1, 2, 3],
+        course_map,
+        [1, 2, 3],
+        3,
+        2,
+        seed,
+        batch_size,
+        responses_file,
+        True,
+    )
+
+    return population._synthesize_status(task)
+
+
+def test_synthetic_responses_follow_the_seed_not_the_distribution_state():
+    distribution = Sampler(4, 0)
+    state = distribution.rng.bit_generator.state
+
+    first = synthesize(distribution, np.random.SeedSequence(1, spawn_key=(1, 1)))
+    repeated = synthesize(distribution, np.random.SeedSequence(1, spawn_key=(1, 1)))
+    fresh = synthesize(distribution, np.random.SeedSequence(None, spawn_key=(1, 1)))
+
+    assert distribution.rng.bit_generator.state == state
+    np.testing.assert_array_equal(first[0], repeated[0])
+    assert not np.array_equal(first[0], fresh[0])
+
+
+def test_synthetic_students_are_drawn_in_batches(tmp_path):
+    responses_file = tmp_path / "synthetic.npy"
+    responses, total_courses, preferred = synthesize(
+        Sampler(4, 0), np.random.SeedSequence(1), 7, responses_file
+    )
+
+    assert responses.shape == (20, 4) and responses.dtype == np.uint8
+    assert len(total_courses) == len(preferred) == 20
+    np.testing.assert_array_equal(np.load(responses_file), responses)
+
+
+def test_actual_and_synthetic_students_rate_irrelevant_courses_alike(
+    survey, course_map, features, schedule, status_max_course_map
+):
+    relevance = qsurvey.StatusRelevance(
+        list(course_map), course_map, STATUS_CRS_PREFIX_MAP
+    )
+    actual = population.StudentPopulation.from_survey(
+        survey,
+        course_map,
+        list(course_map),
+        features,
+        schedule,
+        status_max_course_map,
+        5,
+    )
+    status = int(actual.statuses[0])
+    idxs = relevance.indices(status)
+    responses, total_courses, preferred = population._synthesize_status(
+        (
+            Sampler(len(idxs), 0),
+            20,
+            idxs,
+            course_map,
+            [1, 2, 3],
+            status_max_course_map[status],
+            5,
+            np.random.SeedSequence(1),
+            1000,
+            None,
+            True,
+        )
+    )
+    synthetic = actual._like(
+        responses, np.full(20, status), total_courses, preferred, np.ones(20, bool)
+    )
+    mixed = population.StudentPopulation.concatenate([actual, synthetic])
+
+    responses = mixed.status_responses(status, relevance)
+    irrelevant = ~relevance.mask(status)
+    is_synthetic = mixed.synthetic[mixed.statuses == status]
+
+    assert irrelevant.any() and is_synthetic.any() and not is_synthetic.all()
+    assert (responses[np.ix_(is_synthetic, irrelevant)] == 1).all()
+    assert (responses[np.ix_(~is_synthetic, irrelevant)] == 1).all()
+    assert not (mixed.responses[np.ix_(~mixed.synthetic, irrelevant)] == 1).all()
@@ -0,0 +1,39 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import qsurvey
+
+
+@pytest.mark.parametrize(
+    "name, chunksize",
+    [
+        ("random_survey", 1),
+        ("random_survey", 7),
+        ("random_survey", 100_000),
+        ("survey_data", 97),
+        ("survey_data", 100_000),
+    ],
+)
+def test_chunked_survey_matches_full_read(
+    name, chunksize, survey_files, mapper, crs_sec_cap_map, status_max_course_map
+):
+    included = list(crs_sec_cap_map.keys())
+    full = qsurvey.QSurvey(survey_files[name], mapper, included)
+    chunked = qsurvey.QSurvey(survey_files[name], mapper, included, chunksize=chunksize)
+    all_courses = list(mapper.mapping(full.all_courses).keys())
+
+    assert chunked.all_courses == full.all_courses
+    assert list(chunked.df.columns) == list(full.df.columns)
+    assert (chunked.df[full.questions].dtypes == full.df[full.questions].dtypes).all()
+    assert (chunked.df[full.all_courses].dtypes == qsurvey.RATING_DTYPE).all()
+    pd.testing.assert_frame_equal(
+        chunked.df, full.df, check_dtype=False, check_index_type=False
+    )
+    np.testing.assert_array_equal(chunked.response_ids, full.response_ids)
+    for expected, actual in zip(
+        full.response_matrix(all_courses, status_max_course_map),
+        chunked.response_matrix(all_courses, status_max_course_map),
+    ):
+        assert actual.dtype == expected.dtype
+        np.testing.assert_array_equal(actual, expected)
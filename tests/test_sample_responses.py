@@ -0,0 +1,54 @@
+import numpy as np
+
+import qsurvey
+
+
+class Sampler:
+    """Draws rows of normalized ratings, one at a time or in batches"""
+
+    def __init__(self, num_items, seed):
+        self.num_items = num_items
+        self.rng = np.random.default_rng(seed)
+
+        self.calls = 0
+
+    def sample(self, size=None):
+        self.calls += 1
+        return self.rng.random(
+            self.num_items if size is None else (size, self.num_items)
+        )
+
+
+class OptionalSampler:
+    """Draws one row per call and takes an unrelated optional argument"""
+
+    def __init__(self, num_items):
+        self.num_items = num_items
+
+    def sample(self, random_state=None):
+        assert random_state is None
+        return np.ones(self.num_items)
+
+
+def test_batched_draws_match_single_draws():
+    single = qsurvey.sample_responses(Sampler(3, 0), 50, [0, 2, 4], 5, batched=False)
+    batched = qsurvey.sample_responses(Sampler(3, 0), 50, [0, 2, 4], 5)
+
+    np.testing.assert_array_equal(single, batched)
+
+
+def test_single_draws_pass_no_arguments_to_the_sampler():
+    responses = qsurvey.sample_responses(
+        OptionalSampler(3), 10, [0, 1, 2], 4, batched=False
+    )
+
+    assert responses.shape == (10, 4)
+    np.testing.assert_array_equal(responses[:, :3], 8)
+
+
+def test_default_draws_are_batched():
+    sampler = Sampler(3, 0)
+    responses = qsurvey.sample_responses(sampler, 1000, [0, 2, 4], 5)
+
+    assert responses.shape == (1000, 5)
+    assert sampler.calls < 1000
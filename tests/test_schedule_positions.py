@@ -0,0 +1,33 @@
+import copy
+
+import pytest
+
+import qsurvey
+
+
+class Item:
+    def __init__(self, values):
+        self.values = values
+
+    def __eq__(self, other):
+        return isinstance(other, Item) and self.values == other.values
+
+
+def test_schedule_positions_matches_identical_items():
+    schedule = [Item([i]) for i in range(5)]
+
+    assert qsurvey.schedule_positions([schedule[3], schedule[1]], schedule) == [3, 1]
+
+
+def test_schedule_positions_matches_equal_items():
+    schedule = [Item([i]) for i in range(5)]
+    items = copy.deepcopy([schedule[4], schedule[0]])
+
+    assert qsurvey.schedule_positions(items, schedule) == [4, 0]
+
+
+def test_schedule_positions_rejects_missing_items():
+    schedule = [Item([i]) for i in range(5)]
+
+    with pytest.raises(ValueError):
+        qsurvey.schedule_positions([Item([7])], schedule)
@@ -0,0 +1,22 @@
+import numpy as np
+import pytest
+
+import qsurvey
+
+
+@pytest.mark.parametrize("pref_thresh", [1, 2, 3, 5, 10, 50])
+def test_batch_top_preferred_matches_top_preferred(
+    survey, course_map, status_max_course_map, pref_thresh
+):
+    all_courses = list(course_map.keys())
+    responses, _, _, _ = survey.response_matrix(all_courses, status_max_course_map)
+    preferences = np.where(responses > 0, responses, 1)
+    # top_preferred returns schedule items, so a schedule of positions yields indices
+    positions = list(range(len(all_courses)))
+
+    batch = qsurvey.batch_top_preferred(course_map, preferences, pref_thresh)
+
+    assert len(batch) == len(preferences)
+    for row, idxs in zip(preferences, batch):
+        expected = qsurvey.top_preferred(course_map, positions, None, row, pref_thresh)
+        assert idxs.tolist() == expected